@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+import numpy as np
+from app import models, schemas
+from app.core.replicas import get_read_db
+from app.core.auth import is_recruiter_or_admin
+from app.core.scheduling import epoch_seconds
+
+router = APIRouter()
+
+# Stages in pipeline order; Rejected can follow any of them
+MAIN_PATH = [status for status in models.CANDIDATE_STATUSES if status != "Rejected"]
+
+def median_stints_query(stints):
+    """Completed stints and their median length in seconds per status, aggregated in the database."""
+    return select(
+        stints.c.status, func.count(), func.percentile_cont(0.5).within_group(stints.c.seconds),
+    ).where(stints.c.seconds.is_not(None)).group_by(stints.c.status)
+
+def stage_medians(db: Session, stints) -> Dict[str, Tuple[int, float]]:
+    """(completed stints, median seconds) per status."""
+    if db.get_bind().dialect.name == "postgresql":
+        return {status: (count, median) for status, count, median in db.execute(median_stints_query(stints))}
+    # No ordered-set aggregates on SQLite: pull the durations, which only
+    # small single-node installs do
+    rows = db.execute(select(stints.c.status, stints.c.seconds).where(stints.c.seconds.is_not(None))).all()
+    statuses = np.array([status for status, _ in rows], dtype=object)
+    seconds = np.array([value for _, value in rows], dtype=float)
+    medians = {}
+    for status in np.unique(statuses):
+        durations = seconds[statuses == status]
+        medians[status] = (len(durations), float(np.median(durations)))
+    return medians
+
+@router.get("/analytics/funnel", response_model=schemas.Funnel)
+def get_funnel(
+    job_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can view analytics
+):
+    """
+    Conversion rates and median time-in-stage, overall or for one job,
+    from the status transition log
+    """
+    transitions = models.StatusTransition
+    scope = [transitions.job_id == job_id] if job_id is not None else []
+
+    # A candidate reached a stage if it moved into or out of it; the union
+    # removes duplicate (candidate, stage) pairs
+    stays = union(
+        select(transitions.candidate_id, transitions.to_status.label("status")).where(*scope),
+        select(transitions.candidate_id, transitions.from_status.label("status")).where(
+            transitions.from_status.is_not(None), *scope
+        ),
+    ).subquery()
+    reached = dict(db.execute(select(stays.c.status, func.count()).group_by(stays.c.status)).all())
+    entered = db.scalar(select(func.count(func.distinct(stays.c.candidate_id)))) or 0
+
+    current_query = select(models.Candidate.status, func.count(models.Candidate.id)).group_by(models.Candidate.status)
+    if job_id is not None:
+        current_query = current_query.where(models.Candidate.job_id == job_id)
+    current = dict(db.execute(current_query).all())
+
+    # Each transition starts a stay that ends at the candidate's next transition
+    changed_at = epoch_seconds(transitions.changed_at, db.get_bind().dialect.name)
+    stints = select(
+        transitions.to_status.label("status"),
+        (func.lead(changed_at).over(
+            partition_by=transitions.candidate_id, order_by=(transitions.changed_at, transitions.id)
+        ) - changed_at).label("seconds"),
+    ).where(*scope).subquery()
+    # The median is computed where the rows are: percentile_cont on PostgreSQL
+    medians = stage_medians(db, stints)
+
+    stages = []
+    for status in models.CANDIDATE_STATUSES:
+        completed, median = medians.get(status, (0, None))
+        stage = {
+            "status": status,
+            "reached": reached.get(status, 0),
+            "current": current.get(status, 0),
+            "completed_stints": completed,
+            "median_hours_in_stage": round(float(median) / 3600, 2) if completed else None,
+        }
+        if status in MAIN_PATH and MAIN_PATH.index(status) > 0:
+            previous = reached.get(MAIN_PATH[MAIN_PATH.index(status) - 1], 0)
+            stage["conversion_rate"] = round(stage["reached"] / previous, 4) if previous else None
+        stages.append(stage)
+
+    return {"job_id": job_id, "entered": entered, "stages": stages}
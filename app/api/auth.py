@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.core.database import get_db
-from app.core.auth import get_password_hash, verify_password, create_access_token, get_current_user, is_admin
+from app.core.auth import get_password_hash, verify_password, create_access_token, get_current_user, is_admin, invalidate_principal, principal_cache_stats
+from app.core.pagination import paginate
 from datetime import timedelta, datetime
 from typing import List, Optional
 from app.models.base import UserRole  # Import the UserRole enum
@@ -83,8 +84,10 @@ def read_users_me(current_user: schemas.User = Depends(get_current_user)):
 
 @router.get("/users", response_model=List[schemas.User])
 def get_users(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
     role: Optional[str] = None,  # Add role parameter
     current_user: schemas.User = Depends(is_admin), 
     db: Session = Depends(get_db)
@@ -97,7 +100,7 @@ def get_users(
         query = query.filter(models.User.role == role)
         
     # Apply pagination
-    users = query.offset(skip).limit(limit).all()
+    users = paginate(query, [models.User.id], response, cursor, limit, skip)
     return users
 
 @router.post("/users", response_model=schemas.User)
@@ -130,5 +133,11 @@ def approve_user(user_id: int, db: Session = Depends(get_db), current_user: sche
     
     user.is_approved = True
     db.commit()
+    invalidate_principal(user.username)
     db.refresh(user)
-    return user
\ No newline at end of file
+    return user
+
+@router.get("/principal-cache/stats")
+def get_principal_cache_stats(current_user: schemas.User = Depends(is_admin)):
+    """Hit/miss counters of the authenticated-principal cache (admin only)"""
+    return principal_cache_stats()
\ No newline at end of file
@@ -1,20 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.replicas import get_async_read_db
+from app.core.etags import conditional
 from app.core.auth import get_current_user, is_recruiter_or_admin, is_interviewer_or_above
+from app.core.fieldsets import parse_fields, load_fields, project
+from app.core.pagination import paginate_async
+from app.core.storage import cv_store
+from app.core import cv_extraction
+from app.core.search import search, load_ranked
+from app.core.matching import matching_engine
+from app.core import bulk_import
+from app.core.pipeline import record_job_change, record_removal, record_transition
 
 router = APIRouter()
 
+CANDIDATE_FIELDS = list(schemas.Candidate.model_fields)
+CANDIDATE_SUMMARY_FIELDS = list(schemas.CandidateSummary.model_fields)
+FIELDS_DESCRIPTION = "Comma-separated fields to return, or 'summary'. Omit for full rows."
+
 @router.post("/candidates/", response_model=schemas.Candidate)
-def create_candidate(
+async def create_candidate(
     candidate: schemas.CandidateCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can add candidates
 ):
     # Check if job exists
-    job = db.query(models.JobPosting).filter(models.JobPosting.id == candidate.job_id).first()
+    job = await db.scalar(select(models.JobPosting.id).where(models.JobPosting.id == candidate.job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -28,91 +45,161 @@ def create_candidate(
         )
         
         db.add(db_candidate)
-        db.commit()
-        db.refresh(db_candidate)
+        await db.flush()
+        await db.run_sync(record_transition, db_candidate.id, db_candidate.job_id, None, db_candidate.status, current_user.id)
+        await db.commit()
+        await db.refresh(db_candidate)
         return db_candidate
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-@router.get("/candidates/", response_model=List[schemas.Candidate])
-def read_candidates(
+@router.post("/candidates/import", response_model=schemas.ImportReport)
+async def import_candidates(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the file name when omitted"),
+    batch_size: int = Query(bulk_import.DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can add candidates
+):
+    """Bulk-create candidates from a CSV or NDJSON file, streamed line by line"""
+    fmt = format or bulk_import.detect_format(file.filename, file.content_type)
+    if fmt not in bulk_import.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {', '.join(bulk_import.FORMATS)}")
+    
+    # Raw lines: each is decoded on its own, so bad bytes fail only their row
+    return await bulk_import.import_candidates_async(db, bulk_import.iter_records(file.file, fmt), batch_size)
+
+@router.get("/candidates/", response_model=List[schemas.CandidatePartial], response_model_exclude_unset=True)
+async def read_candidates(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.User = Depends(is_interviewer_or_above)  # Interviewers and above can view candidates
+):
+    names = parse_fields(fields, CANDIDATE_FIELDS, CANDIDATE_SUMMARY_FIELDS)
+    query = select(models.Candidate)
+    if names:
+        query = query.options(load_fields(models.Candidate, names))
+    candidates = await paginate_async(db, query, [models.Candidate.id], response, cursor, limit, skip)
+    return project(candidates, names)
+
+@router.get("/candidates/search", response_model=List[schemas.CandidateSearchResult])
+async def search_candidates(
+    q: str = Query(..., min_length=1, description="Words to find in name, email or CV text"),
+    job_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: schemas.User = Depends(is_interviewer_or_above)  # Interviewers and above can view candidates
 ):
-    candidates = db.query(models.Candidate).offset(skip).limit(limit).all()
-    return candidates
+    """Full-text search over candidates, best matches first"""
+    hits = await search(db, models.Candidate.__tablename__, q, limit, offset, {"job_id": job_id} if job_id else None)
+    rows = await load_ranked(db, models.Candidate, hits, [load_fields(models.Candidate, CANDIDATE_SUMMARY_FIELDS)])
+    return [{"rank": rank, "candidate": candidate} for candidate, rank in rows]
 
 @router.get("/candidates/{candidate_id}", response_model=schemas.Candidate)
-def read_candidate(
+async def read_candidate(
     candidate_id: int, 
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(is_interviewer_or_above)  # Interviewers and above can view candidates
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.User = Depends(is_interviewer_or_above),  # Interviewers and above can view candidates
+    etag: str = Depends(conditional(models.Candidate.__tablename__))
 ):
-    candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    candidate = await db.get(models.Candidate, candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     return candidate
 
+@router.get("/candidates/{candidate_id}/ranked-jobs", response_model=List[schemas.RankedJob])
+async def get_ranked_jobs(
+    candidate_id: int,
+    k: int = Query(20, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can rank jobs
+):
+    """Top-k jobs for a candidate by CV similarity and required-skill overlap"""
+    if not await db.scalar(select(models.Candidate.id).where(models.Candidate.id == candidate_id)):
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    
+    await matching_engine.load_async(db)
+    # Scoring is CPU-bound; keep it off the event loop
+    matches = await run_in_threadpool(matching_engine.rank_jobs, candidate_id, k)
+    
+    rows = await load_ranked(db, models.JobPosting, [(m["id"], 0.0) for m in matches], [load_fields(models.JobPosting, list(schemas.JobSummary.model_fields))])
+    by_id = {job.id: job for job, _ in rows}
+    return [{**m, "job": by_id[m["id"]]} for m in matches if m["id"] in by_id]
+
 @router.put("/candidates/{candidate_id}", response_model=schemas.Candidate)
-def update_candidate(
+async def update_candidate(
     candidate_id: int, 
     candidate: schemas.CandidateCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can update candidates
 ):
-    db_candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    # Locked so the pipeline counters see the status this change replaces
+    db_candidate = await db.get(models.Candidate, candidate_id, with_for_update=True)
     if not db_candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
     # Check if job exists
     if candidate.job_id:
-        job = db.query(models.JobPosting).filter(models.JobPosting.id == candidate.job_id).first()
+        job = await db.scalar(select(models.JobPosting.id).where(models.JobPosting.id == candidate.job_id))
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
     
+    old_job_id, old_status = db_candidate.job_id, db_candidate.status
     for key, value in vars(candidate).items():
         setattr(db_candidate, key, value)
+    await db.run_sync(record_job_change, old_job_id, db_candidate.job_id, old_status)
+    await db.run_sync(record_transition, db_candidate.id, db_candidate.job_id, old_status, db_candidate.status, current_user.id)
     
-    db.commit()
-    db.refresh(db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
     return db_candidate
 
 @router.delete("/candidates/{candidate_id}")
-def delete_candidate(
+async def delete_candidate(
     candidate_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can delete candidates
 ):
-    db_candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    # Locked so the pipeline counters see the status this change replaces
+    db_candidate = await db.get(models.Candidate, candidate_id, with_for_update=True)
     if not db_candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    db.delete(db_candidate)
-    db.commit()
+    await db.run_sync(record_removal, db_candidate.job_id, db_candidate.status)
+    await db.delete(db_candidate)
+    await db.commit()
     return {"detail": "Candidate deleted successfully"}
 
-@router.post("/candidates/upload/")
+@router.post("/candidates/upload/", response_model=schemas.Candidate)
 async def upload_cv(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     email: str = Form(...),
     job_id: int = Form(...),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if job exists
-    job = db.query(models.JobPosting).filter(models.JobPosting.id == job_id).first()
+    job = await db.scalar(select(models.JobPosting.id).where(models.JobPosting.id == job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Read file contents
-    cv_content = await file.read()
-    try:
-        cv_text = cv_content.decode("utf-8")
-    except UnicodeDecodeError:
-        cv_text = f"Binary content from {file.filename}"
+    # Stream the file into the blob store; the row only references it
+    blob = await cv_store.save_upload(file)
+    
+    # Text files keep a capped copy of their text on the row; documents get
+    # theirs extracted in the background. Magic bytes and the declared type
+    # come first: an ASCII-only PDF decodes as UTF-8 too.
+    if blob.text is not None and not cv_extraction.is_document(blob.head, file.content_type, file.filename):
+        cv_text, extraction_status = blob.text, None
+    else:
+        cv_text, extraction_status = "", cv_extraction.PENDING
     
     # Create candidate with uploaded CV
     db_candidate = models.Candidate(
@@ -120,22 +207,66 @@ async def upload_cv(
         email=email,
         cv_text=cv_text,
         status="Applied",  # Initial status
-        job_id=job_id
+        job_id=job_id,
+        cv_sha256=blob.sha256,
+        cv_filename=file.filename,
+        cv_content_type=file.content_type,
+        cv_size=blob.size,
+        cv_extraction_status=extraction_status
     )
     
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
+    await db.flush()
+    await db.run_sync(record_transition, db_candidate.id, job_id, None, db_candidate.status)
+    await db.commit()
+    await db.refresh(db_candidate)
+    
+    if extraction_status == cv_extraction.PENDING:
+        background_tasks.add_task(cv_extraction.run_extraction, db_candidate.id, blob.path, file.content_type, file.filename)
     
     return db_candidate
 
+@router.get("/candidates/{candidate_id}/extraction", response_model=schemas.CandidateExtraction)
+async def get_extraction_status(
+    candidate_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(is_interviewer_or_above)  # Interviewers and above can view candidates
+):
+    candidate = await db.scalar(select(models.Candidate).options(
+        load_fields(models.Candidate, ["cv_extraction_status", "cv_extraction_error"])
+    ).where(models.Candidate.id == candidate_id))
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return candidate
+
+@router.get("/candidates/{candidate_id}/cv")
+async def download_cv(
+    candidate_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(is_interviewer_or_above)  # Interviewers and above can view candidates
+):
+    candidate = await db.scalar(select(models.Candidate).options(
+        load_fields(models.Candidate, ["cv_sha256", "cv_filename", "cv_content_type"])
+    ).where(models.Candidate.id == candidate_id))
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    if not candidate.cv_sha256 or not cv_store.exists(candidate.cv_sha256):
+        raise HTTPException(status_code=404, detail="No CV file stored for this candidate")
+    
+    return FileResponse(
+        cv_store.path_for(candidate.cv_sha256),
+        media_type=candidate.cv_content_type or "application/octet-stream",
+        filename=candidate.cv_filename or f"cv-{candidate_id}"
+    )
+
 @router.put("/candidates/{candidate_id}/status")
-def update_status(
+async def update_status(
     candidate_id: int, 
     status: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    # Locked so the pipeline counters see the status this change replaces
+    db_candidate = await db.get(models.Candidate, candidate_id, with_for_update=True)
     if not db_candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
@@ -143,22 +274,31 @@ def update_status(
     if status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
     
+    await db.run_sync(record_transition, db_candidate.id, db_candidate.job_id, db_candidate.status, status)
     db_candidate.status = status
-    db.commit()
-    db.refresh(db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
     
     return {"id": db_candidate.id, "status": db_candidate.status}
 
-@router.get("/jobs/{job_id}/candidates", response_model=List[schemas.Candidate])
-def get_candidates_for_job(job_id: int, db: Session = Depends(get_db)):
+@router.get("/jobs/{job_id}/candidates", response_model=List[schemas.CandidatePartial], response_model_exclude_unset=True)
+async def get_candidates_for_job(
+    job_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    names = parse_fields(fields, CANDIDATE_FIELDS, CANDIDATE_SUMMARY_FIELDS)
+
     # Check if job exists
-    job = db.query(models.JobPosting).filter(models.JobPosting.id == job_id).first()
+    job = await db.scalar(select(models.JobPosting.id).where(models.JobPosting.id == job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Get all candidates for this job
-    candidates = db.query(models.Candidate).filter(models.Candidate.job_id == job_id).all()
-    return candidates
+    query = select(models.Candidate).where(models.Candidate.job_id == job_id)
+    if names:
+        query = query.options(load_fields(models.Candidate, names))
+    return project((await db.scalars(query)).all(), names)
 
 # Uncomment this if you want to implement CV summarization with OpenAI
 # @router.post("/candidates/{candidate_id}/summarize")
@@ -1,29 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, noload, load_only
+from typing import List, Optional
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.replicas import get_async_read_db
 from app.core.auth import get_current_user, is_recruiter_or_admin, is_interviewer_or_above
-from datetime import datetime
+from app.core.pagination import paginate_async
+from app.core.pipeline import record_transition
+from app.core.scheduling import (
+    MAX_INTERVIEW_MINUTES, as_utc_naive, busy_intervals, find_conflicts, free_slots, merge_intervals, working_windows,
+)
+from datetime import datetime, time, timedelta
 
 router = APIRouter()
 
-@router.post("/interviews/", response_model=schemas.Interview)
-def create_interview(
+# Relationships that can be embedded with ?include=, loaded with the summary columns only
+INCLUDABLE = {
+    "candidate": (models.Interview.candidate, models.Candidate, schemas.CandidateSummary),
+    "job": (models.Interview.job, models.JobPosting, schemas.JobSummary),
+}
+
+def _include_options(include: Optional[str]):
+    """Eager-load feedback plus any requested relationships; everything else is never loaded."""
+    requested = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = requested - set(INCLUDABLE)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include '{', '.join(sorted(unknown))}'. Must be one of: {', '.join(INCLUDABLE)}"
+        )
+
+    options = [selectinload(models.Interview.feedback)]
+    for name, (relationship, model, summary) in INCLUDABLE.items():
+        if name in requested:
+            columns = [getattr(model, field) for field in summary.model_fields]
+            options.append(selectinload(relationship).options(load_only(*columns)))
+        else:
+            options.append(noload(relationship))
+    return options
+
+@router.post(
+    "/interviews/",
+    response_model=schemas.Interview,
+    responses={409: {"model": schemas.InterviewConflictError, "description": "Overlaps existing interviews"}},
+)
+async def create_interview(
     interview: schemas.InterviewCreate, 
-    db: Session = Depends(get_db),
+    allow_conflicts: bool = Query(False, description="Schedule even if the interviewer or candidate is already booked"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can schedule interviews
 ):
     """Schedule a new interview"""
-    # Verify candidate exists
-    candidate = db.query(models.Candidate).filter(models.Candidate.id == interview.candidate_id).first()
+    # Verify candidate exists; the row lock serialises concurrent bookings for the candidate
+    candidate = await db.get(models.Candidate, interview.candidate_id, with_for_update=True)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
     # Verify job exists
-    job = db.query(models.JobPosting).filter(models.JobPosting.id == interview.job_id).first()
+    job = await db.scalar(select(models.JobPosting.id).where(models.JobPosting.id == interview.job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+
+    if interview.interviewer_user_id is not None:
+        # Same for the interviewer's calendar. Without an interviewer only the
+        # candidate is checked: the recruiter booking it isn't the one attending.
+        interviewer = await db.scalar(
+            select(models.User.id).where(models.User.id == interview.interviewer_user_id).with_for_update()
+        )
+        if not interviewer:
+            raise HTTPException(status_code=404, detail="Interviewer not found")
+
+    scheduled_date = as_utc_naive(interview.scheduled_date)
+    if not allow_conflicts:
+        conflicts = await db.run_sync(
+            find_conflicts, scheduled_date, interview.duration_minutes,
+            interviewer_user_id=interview.interviewer_user_id, candidate_id=interview.candidate_id,
+        )
+        if conflicts:
+            await db.rollback()
+            detail = schemas.InterviewConflictError(
+                message="Interview overlaps existing interviews; retry with allow_conflicts=true to book anyway",
+                conflicts=conflicts,
+            )
+            raise HTTPException(status_code=409, detail=detail.model_dump(mode="json"))
     
     try:
         # Create new interview
@@ -31,8 +92,8 @@ def create_interview(
             candidate_id=interview.candidate_id,
             job_id=interview.job_id,
             interviewer_name=interview.interviewer,  # Keep for backward compatibility
-            interviewer_user_id=current_user.id,  # Link to the user who scheduled it
-            scheduled_date=interview.scheduled_date,
+            interviewer_user_id=interview.interviewer_user_id or current_user.id,
+            scheduled_date=scheduled_date,
             duration_minutes=interview.duration_minutes,
             completed=interview.completed
         )
@@ -41,6 +102,7 @@ def create_interview(
         
         # Update candidate status if currently in "Applied" or "Screening"
         if candidate.status in ["Applied", "Screening"]:
+            await db.run_sync(record_transition, candidate.id, candidate.job_id, candidate.status, "Interview Scheduled", current_user.id)
             candidate.status = "Interview Scheduled"
             
         # Create notification
@@ -51,45 +113,95 @@ def create_interview(
         )
         db.add(notification)
             
-        db.commit()
-        db.refresh(db_interview)
+        await db.commit()
+        await db.refresh(db_interview)
         return db_interview
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating interview: {str(e)}")
 
-@router.get("/interviews/", response_model=List[schemas.InterviewWithFeedback])
-def get_interviews(
-    db: Session = Depends(get_db), 
+@router.get("/interviews/", response_model=List[schemas.InterviewDetail])
+async def get_interviews(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db), 
     candidate_id: int = None, 
     job_id: int = None,
+    include: Optional[str] = Query(None, description="Comma-separated relationships to embed: candidate, job"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     current_user: schemas.User = Depends(get_current_user)  # All authenticated users can view interviews
 ):
     """Get all interviews with optional filtering"""
-    query = db.query(models.Interview)
+    query = select(models.Interview).options(*_include_options(include))
     
     # For interviewers, only show interviews they're assigned to
     if current_user.role == "interviewer":
-        query = query.filter(models.Interview.interviewer_user_id == current_user.id)
+        query = query.where(models.Interview.interviewer_user_id == current_user.id)
     
     if candidate_id:
-        query = query.filter(models.Interview.candidate_id == candidate_id)
+        query = query.where(models.Interview.candidate_id == candidate_id)
     
     if job_id:
-        query = query.filter(models.Interview.job_id == job_id)
+        query = query.where(models.Interview.job_id == job_id)
     
-    interviews = query.all()
+    interviews = await paginate_async(db, query, [models.Interview.id], response, cursor, limit)
     return interviews
 
+MAX_AVAILABILITY_DAYS = 62
+MAX_AVAILABILITY_INTERVIEWERS = 1000
+
+@router.get("/interviews/availability", response_model=schemas.Availability)
+async def get_availability(
+    interviewer_ids: str = Query(..., description="Comma-separated user ids of the interviewers who must all be free"),
+    start: datetime = Query(..., description="Start of the search range (UTC)"),
+    end: datetime = Query(..., description="End of the search range (UTC)"),
+    candidate_id: Optional[int] = Query(None, description="Candidate who must also be free"),
+    duration_minutes: int = Query(60, ge=1, le=MAX_INTERVIEW_MINUTES),
+    day_start: time = Query(time(9), description="Start of working hours (UTC)"),
+    day_end: time = Query(time(17), description="End of working hours (UTC)"),
+    include_weekends: bool = False,
+    limit: int = Query(200, ge=1, le=2000),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins schedule interviews
+):
+    """Common free slots of the interviewers and candidate, earliest first"""
+    try:
+        ids = sorted({int(part) for part in interviewer_ids.split(",") if part.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="interviewer_ids must be comma-separated integers")
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one interviewer is required")
+    if len(ids) > MAX_AVAILABILITY_INTERVIEWERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_AVAILABILITY_INTERVIEWERS} interviewers per request")
+
+    start, end = as_utc_naive(start), as_utc_naive(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > timedelta(days=MAX_AVAILABILITY_DAYS):
+        raise HTTPException(status_code=400, detail=f"The range can span at most {MAX_AVAILABILITY_DAYS} days")
+    if day_end <= day_start:
+        raise HTTPException(status_code=400, detail="day_end must be after day_start")
+
+    busy = merge_intervals(*await db.run_sync(busy_intervals, start, end, ids, candidate_id))
+    windows = working_windows(start, end, day_start, day_end, weekdays_only=not include_weekends)
+    slots = free_slots(busy, windows, timedelta(minutes=duration_minutes))
+    return {
+        "interviewer_user_ids": ids,
+        "candidate_id": candidate_id,
+        "duration_minutes": duration_minutes,
+        "busy_intervals": len(busy),
+        "slots": [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots[:limit]],
+    }
+
 @router.get("/interviews/{interview_id}", response_model=schemas.InterviewWithFeedback)
-def get_interview(
+async def get_interview(
     interview_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: schemas.User = Depends(get_current_user)  # All authenticated users
 ):
     """Get a specific interview by ID"""
-    interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+    interview = await db.get(models.Interview, interview_id, options=[selectinload(models.Interview.feedback)])
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     
@@ -100,14 +212,14 @@ def get_interview(
     return interview
 
 @router.post("/feedback/", response_model=schemas.Feedback)
-def add_feedback(
+async def add_feedback(
     feedback: schemas.FeedbackCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_interviewer_or_above)  # Interviewers and above can add feedback
 ):
     """Add feedback for an interview"""
     # Verify interview exists
-    interview = db.query(models.Interview).filter(models.Interview.id == feedback.interview_id).first()
+    interview = await db.get(models.Interview, feedback.interview_id)
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     
@@ -119,9 +231,9 @@ def add_feedback(
         )
     
     # Check if feedback already exists
-    existing_feedback = db.query(models.Feedback).filter(
+    existing_feedback = await db.scalar(select(models.Feedback.id).where(
         models.Feedback.interview_id == feedback.interview_id
-    ).first()
+    ))
     
     if existing_feedback:
         raise HTTPException(status_code=400, detail="Feedback already exists for this interview")
@@ -150,10 +262,10 @@ def add_feedback(
         )
         db.add(notification)
         
-        db.commit()
-        db.refresh(db_feedback)
+        await db.commit()
+        await db.refresh(db_feedback)
         return db_feedback
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error adding feedback: {str(e)}")
\ No newline at end of file
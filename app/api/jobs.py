@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.replicas import get_async_read_db
+from app.core.etags import conditional
 from app.core.auth import get_current_user, is_recruiter_or_admin
-from typing import List
+from app.core.fieldsets import parse_fields, load_fields, project
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate_async
+from app.core import job_cache
+from app.core.pipeline import job_counts, remove_job_counters
+from app.core.search import search, load_ranked
+from app.core.matching import matching_engine
+from typing import List, Optional
 
 router = APIRouter()
 
+JOB_FIELDS = list(schemas.Job.model_fields)
+JOB_SUMMARY_FIELDS = list(schemas.JobSummary.model_fields)
+CANDIDATE_SUMMARY_FIELDS = list(schemas.CandidateSummary.model_fields)
+
 @router.post("/jobs/", response_model=schemas.Job)
-def create_job(
+async def create_job(
     job: schemas.JobCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can create jobs
 ):
     print(f"Type of job: {type(job)}")
@@ -30,9 +44,10 @@ def create_job(
         try:
             db.add(db_job)
             print("Job added to session")
-            db.commit()
+            await db.commit()
+            job_cache.invalidate()
             print("Session committed")
-            db.refresh(db_job)
+            await db.refresh(db_job)
             print(f"Job refreshed, id: {db_job.id}")
             
             # Convert to dict for debugging
@@ -50,61 +65,135 @@ def create_job(
             
         except Exception as db_err:
             print(f"Database operation error: {str(db_err)}")
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"Database error: {str(db_err)}")
             
     except Exception as e:
         print(f"Error creating job: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-@router.get("/jobs/", response_model=List[schemas.Job])
-def get_jobs(
+@router.get("/jobs/", response_model=List[schemas.JobPartial], response_model_exclude_unset=True)
+async def get_jobs(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, or 'summary'. Omit for full rows."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.User = Depends(get_current_user),  # All users can view jobs
+    etag: str = Depends(conditional(models.JobPosting.__tablename__))
+):
+    names = parse_fields(fields, JOB_FIELDS, JOB_SUMMARY_FIELDS)
+
+    async def load():
+        query = select(models.JobPosting)
+        if names:
+            query = query.options(load_fields(models.JobPosting, names))
+        jobs = await paginate_async(db, query, [models.JobPosting.id], response, cursor, limit, skip)
+        items = [schemas.JobPartial.model_validate(job).model_dump(exclude_unset=True) for job in project(jobs, names)]
+        return {"items": items, "next_cursor": response.headers.get(NEXT_CURSOR_HEADER)}
+
+    page = await job_cache.cached(etag, load)
+    if page["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+    return page["items"]
+
+@router.get("/jobs/search", response_model=List[schemas.JobSearchResult])
+async def search_jobs(
+    q: str = Query(..., min_length=1, description="Words to find in title, description or required skills"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: schemas.User = Depends(get_current_user)  # All users can view jobs
 ):
-    jobs = db.query(models.JobPosting).offset(skip).limit(limit).all()
-    return jobs
+    """Full-text search over job postings, best matches first"""
+    hits = await search(db, models.JobPosting.__tablename__, q, limit, offset)
+    rows = await load_ranked(db, models.JobPosting, hits, [load_fields(models.JobPosting, JOB_SUMMARY_FIELDS)])
+    return [{"rank": rank, "job": job} for job, rank in rows]
 
 @router.get("/jobs/{job_id}", response_model=schemas.Job)
-def read_job(
+async def read_job(
     job_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.User = Depends(get_current_user),  # All users can view job details
+    etag: str = Depends(conditional(models.JobPosting.__tablename__))
+):
+    async def load():
+        job = await db.get(models.JobPosting, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return schemas.Job.model_validate(job).model_dump()
+
+    return await job_cache.cached(etag, load)
+
+@router.get("/jobs/{job_id}/stats", response_model=schemas.JobStats)
+async def get_job_stats(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: schemas.User = Depends(get_current_user)  # All users can view job details
 ):
-    job = db.query(models.JobPosting).filter(models.JobPosting.id == job_id).first()
+    """Candidates per status, read from the maintained pipeline counters"""
+    if await db.scalar(select(models.JobPosting.id).where(models.JobPosting.id == job_id)) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    counts = await db.run_sync(job_counts, job_id)
+    counts = {status: counts.get(status, 0) for status in models.CANDIDATE_STATUSES}
+    return {"job_id": job_id, "total": sum(counts.values()), "counts": counts}
+
+@router.get("/jobs/{job_id}/ranked-candidates", response_model=List[schemas.RankedCandidate])
+async def get_ranked_candidates(
+    job_id: int,
+    k: int = Query(20, ge=1, le=500),
+    applicants_only: bool = Query(True, description="Rank only candidates who applied to this job; false ranks the whole pool"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can rank candidates
+):
+    """Top-k candidates for a job by CV similarity and required-skill overlap"""
+    job = (await db.execute(
+        select(models.JobPosting.title, models.JobPosting.required_skills).where(models.JobPosting.id == job_id)
+    )).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    
+    await matching_engine.load_async(db)
+    # Scoring is CPU-bound; keep it off the event loop
+    matches = await run_in_threadpool(
+        matching_engine.rank_candidates, job.title, job.required_skills, k, job_id if applicants_only else None
+    )
+    
+    rows = await load_ranked(db, models.Candidate, [(m["id"], 0.0) for m in matches], [load_fields(models.Candidate, CANDIDATE_SUMMARY_FIELDS)])
+    by_id = {candidate.id: candidate for candidate, _ in rows}
+    return [{**m, "candidate": by_id[m["id"]]} for m in matches if m["id"] in by_id]
 
 @router.put("/jobs/{job_id}", response_model=schemas.Job)
-def update_job(
+async def update_job(
     job_id: int, 
     job: schemas.JobCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can update jobs
 ):
-    db_job = db.query(models.JobPosting).filter(models.JobPosting.id == job_id).first()
+    db_job = await db.get(models.JobPosting, job_id)
     if not db_job:
         raise HTTPException(status_code=404, detail="Job not found")
     for key, value in job.dict().items():
         setattr(db_job, key, value)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    job_cache.invalidate()
+    await db.refresh(db_job)
     return db_job
 
 @router.delete("/jobs/{job_id}")
-def delete_job(
+async def delete_job(
     job_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.User = Depends(is_recruiter_or_admin)  # Only recruiters/admins can delete jobs
 ):
-    db_job = db.query(models.JobPosting).filter(models.JobPosting.id == job_id).first()
+    db_job = await db.get(models.JobPosting, job_id)
     if not db_job:
         raise HTTPException(status_code=404, detail="Job not found")
-    db.delete(db_job)
-    db.commit()
+    await db.delete(db_job)
+    await db.run_sync(remove_job_counters, job_id)
+    await db.commit()
+    job_cache.invalidate()
     return {"detail": "Job deleted successfully"}
 
 # Similar CRUD endpoints for candidates, interviews
@@ -1,24 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import Dict, List, Optional
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.replicas import get_async_read_db
+from app.core.etags import conditional
+from app.core.pagination import apply_keyset, split_page
+from app.core.events import event_bus, notification_event
+from app.core.pipeline import record_transition, record_transitions, transition
 
 router = APIRouter()
 
+# Columns needed to render a card; cv_text stays in the database
+CARD_COLUMNS = (
+    models.Candidate.id,
+    models.Candidate.name,
+    models.Candidate.email,
+    models.Candidate.status,
+    models.Candidate.job_id,
+)
+
+async def _column_page(db: AsyncSession, status: str, job_id: Optional[int], cursor: Optional[str], limit: int):
+    query = select(models.Candidate).options(load_only(*CARD_COLUMNS)).where(models.Candidate.status == status)
+    if job_id is not None:
+        query = query.where(models.Candidate.job_id == job_id)
+    rows = (await db.scalars(apply_keyset(query, [models.Candidate.id], cursor, limit))).all()
+    return split_page(rows, [models.Candidate.id], limit)
+
 @router.get("/kanban", response_model=Dict[str, List[schemas.Candidate]])
-def get_kanban_board(db: Session = Depends(get_db)):
+async def get_kanban_board(
+    db: AsyncSession = Depends(get_async_read_db),
+    etag: str = Depends(conditional(models.Candidate.__tablename__))
+):
     """
     Get candidates grouped by their recruitment status (Kanban board view)
     """
-    # Get all valid statuses
-    valid_statuses = ["Applied", "Screening", "Interview Scheduled", "Offer Extended", "Rejected", "Hired"]
-    
     # Initialize result dictionary
-    result = {status: [] for status in valid_statuses}
+    result = {status: [] for status in models.CANDIDATE_STATUSES}
     
     # Query all candidates
-    candidates = db.query(models.Candidate).all()
+    candidates = (await db.scalars(select(models.Candidate))).all()
     
     # Group candidates by status
     for candidate in candidates:
@@ -27,28 +50,72 @@ def get_kanban_board(db: Session = Depends(get_db)):
     
     return result
 
+@router.get("/kanban/board", response_model=schemas.KanbanBoard)
+async def get_kanban_board_page(
+    job_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_read_db),
+    etag: str = Depends(conditional(models.Candidate.__tablename__))
+):
+    """
+    Get the first page of every Kanban column plus per-status counts.
+    Further pages are fetched per column from /kanban/columns/{status}.
+    """
+    counts_query = select(models.Candidate.status, func.count(models.Candidate.id))
+    if job_id is not None:
+        counts_query = counts_query.where(models.Candidate.job_id == job_id)
+    counts = dict((await db.execute(counts_query.group_by(models.Candidate.status))).all())
+
+    columns = []
+    for status in models.CANDIDATE_STATUSES:
+        items, next_cursor = [], None
+        # Empty columns need no query
+        if counts.get(status):
+            items, next_cursor = await _column_page(db, status, job_id, None, limit)
+        columns.append({"status": status, "count": counts.get(status, 0), "items": items, "next_cursor": next_cursor})
+
+    return {"job_id": job_id, "columns": columns}
+
+@router.get("/kanban/columns/{status}", response_model=schemas.KanbanColumnPage)
+async def get_kanban_column(
+    status: str,
+    job_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_read_db),
+    etag: str = Depends(conditional(models.Candidate.__tablename__))
+):
+    """
+    Get one page of a single Kanban column, continuing from `cursor`
+    """
+    if status not in models.CANDIDATE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(models.CANDIDATE_STATUSES)}")
+
+    items, next_cursor = await _column_page(db, status, job_id, cursor, limit)
+    return {"status": status, "items": items, "next_cursor": next_cursor}
+
 @router.put("/kanban/move")
-def move_candidate_status(
+async def move_candidate_status(
     candidate_id: int,
     new_status: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Move a candidate from one status to another (for drag-and-drop functionality)
     """
-    # Verify the candidate exists
-    candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    # Verify the candidate exists; the row lock keeps the old status current until commit
+    candidate = await db.get(models.Candidate, candidate_id, with_for_update=True)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
     # Verify the status is valid
-    valid_statuses = ["Applied", "Screening", "Interview Scheduled", "Offer Extended", "Rejected", "Hired"]
-    if new_status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
+    if new_status not in models.CANDIDATE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(models.CANDIDATE_STATUSES)}")
     
     # Update status
     old_status = candidate.status
     candidate.status = new_status
+    await db.run_sync(record_transition, candidate.id, candidate.job_id, old_status, new_status)
     
     # Create notification for status change
     notification = models.Notification(
@@ -58,6 +125,75 @@ def move_candidate_status(
     )
     db.add(notification)
     
-    db.commit()
+    await db.commit()
+    
+    return {"id": candidate.id, "old_status": old_status, "new_status": new_status}
+
+@router.put("/kanban/move/batch", response_model=List[schemas.KanbanMoveResult])
+async def move_candidates_batch(
+    batch: schemas.KanbanBatchMove,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Move many candidates in one transaction, with one UPDATE per target status
+    and a single bulk notification insert
+    """
+    ids = {move.candidate_id for move in batch.moves}
+    # Locked in id order, so concurrent batches wait for each other instead of deadlocking
+    rows = (await db.execute(
+        select(models.Candidate.id, models.Candidate.status, models.Candidate.job_id)
+        .where(models.Candidate.id.in_(ids))
+        .order_by(models.Candidate.id)
+        .with_for_update()
+    )).all()
+    current = {candidate_id: status for candidate_id, status, _ in rows}
+    job_ids = {candidate_id: job_id for candidate_id, _, job_id in rows}
+    
+    results = []
+    by_status: Dict[str, List[int]] = {}
+    notifications = []
+    transitions = []
+    seen = set()
+    for move in batch.moves:
+        result = {"candidate_id": move.candidate_id, "ok": False, "new_status": move.new_status}
+        if move.candidate_id in seen:
+            result["error"] = "Duplicate candidate in batch"
+        elif move.candidate_id not in current:
+            result["error"] = "Candidate not found"
+        elif move.new_status not in models.CANDIDATE_STATUSES:
+            result["error"] = f"Invalid status. Must be one of: {', '.join(models.CANDIDATE_STATUSES)}"
+        else:
+            old_status = current[move.candidate_id]
+            result.update(ok=True, old_status=old_status)
+            if old_status != move.new_status:
+                by_status.setdefault(move.new_status, []).append(move.candidate_id)
+                transitions.append(transition(move.candidate_id, job_ids[move.candidate_id], old_status, move.new_status))
+                notifications.append({
+                    "candidate_id": move.candidate_id,
+                    "message": f"Candidate status changed from {old_status} to {move.new_status}",
+                    "type": "status_change",
+                })
+        seen.add(move.candidate_id)
+        results.append(result)
+    
+    try:
+        for new_status, candidate_ids in by_status.items():
+            await db.execute(
+                update(models.Candidate)
+                .where(models.Candidate.id.in_(candidate_ids))
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+        if notifications:
+            await db.execute(insert(models.Notification), notifications)
+        await db.run_sync(record_transitions, transitions)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error moving candidates: {str(e)}")
+    
+    # Bulk inserts bypass the ORM hook that publishes notifications
+    for notification in notifications:
+        event_bus.publish(notification_event(**notification))
     
-    return {"id": candidate.id, "old_status": old_status, "new_status": new_status}
\ No newline at end of file
+    return results
\ No newline at end of file
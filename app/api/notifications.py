@@ -1,60 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import paginate_async
+from app.core.events import event_bus
+import json
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = 15
+
 @router.get("/notifications/", response_model=List[schemas.Notification])
-def get_notifications(
-    db: Session = Depends(get_db),
+async def get_notifications(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     candidate_id: int = None,
-    unread_only: bool = False
+    unread_only: bool = False,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
 ):
     """Get notifications with optional filtering"""
-    query = db.query(models.Notification)
+    query = select(models.Notification)
     
     if candidate_id:
-        query = query.filter(models.Notification.candidate_id == candidate_id)
+        query = query.where(models.Notification.candidate_id == candidate_id)
     
     if unread_only:
-        query = query.filter(models.Notification.is_read == False)
+        query = query.where(models.Notification.is_read == False)
     
     # Order by most recent
-    query = query.order_by(models.Notification.created_at.desc())
+    order = [models.Notification.created_at, models.Notification.id]
+    return await paginate_async(db, query, order, response, cursor, limit, descending=True)
+
+@router.get("/notifications/archive", response_model=List[schemas.ArchivedNotification])
+async def get_archived_notifications(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    candidate_id: int = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """Page through notifications moved out by the retention job, most recent first"""
+    query = select(models.NotificationArchive)
+    if candidate_id:
+        query = query.where(models.NotificationArchive.candidate_id == candidate_id)
+    
+    order = [models.NotificationArchive.created_at, models.NotificationArchive.id]
+    return await paginate_async(db, query, order, response, cursor, limit, descending=True)
+
+@router.get("/notifications/stream")
+async def stream_notifications(request: Request, candidate_id: int = None):
+    """Push new notifications as Server-Sent Events instead of polling"""
+    subscription = event_bus.subscribe(candidate_id)
+    
+    async def events():
+        with subscription:
+            # Tell EventSource how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
     
-    notifications = query.all()
-    return notifications
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/notifications/unread-count", response_model=schemas.UnreadCount)
+async def get_unread_count(candidate_id: int = None, db: AsyncSession = Depends(get_async_db)):
+    """Count unread notifications without fetching them
+
+    For one candidate this seeks to (candidate_id, is_read) in
+    ix_notifications_candidate_read_created and counts index entries. The
+    index leads with candidate_id, so the count across all candidates can't
+    seek on it and scans the table instead; retention keeps that table small.
+    """
+    query = select(func.count()).select_from(models.Notification).where(models.Notification.is_read == False)
+    if candidate_id is not None:
+        query = query.where(models.Notification.candidate_id == candidate_id)
+    
+    unread = await db.scalar(query)
+    return {"candidate_id": candidate_id, "unread": unread}
+
+@router.put("/notifications/read")
+async def mark_notifications_read(body: schemas.NotificationIds, db: AsyncSession = Depends(get_async_db)):
+    """Mark a list of notifications as read with a single UPDATE"""
+    result = await db.execute(
+        update(models.Notification)
+        .where(models.Notification.id.in_(body.ids), models.Notification.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    
+    return {"message": f"{result.rowcount} notifications marked as read"}
 
 @router.put("/notifications/{notification_id}/read")
-def mark_notification_read(notification_id: int, db: Session = Depends(get_db)):
+async def mark_notification_read(notification_id: int, db: AsyncSession = Depends(get_async_db)):
     """Mark a notification as read"""
-    notification = db.query(models.Notification).filter(models.Notification.id == notification_id).first()
+    notification = await db.get(models.Notification, notification_id)
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
     notification.is_read = True
-    db.commit()
+    await db.commit()
     
     return {"id": notification.id, "is_read": True}
 
 @router.put("/notifications/read-all")
-def mark_all_notifications_read(candidate_id: int, db: Session = Depends(get_db)):
+async def mark_all_notifications_read(candidate_id: int, db: AsyncSession = Depends(get_async_db)):
     """Mark all notifications for a candidate as read"""
-    notifications = db.query(models.Notification).filter(
-        models.Notification.candidate_id == candidate_id,
-        models.Notification.is_read == False
-    ).all()
+    result = await db.execute(
+        update(models.Notification)
+        .where(
+            models.Notification.candidate_id == candidate_id,
+            models.Notification.is_read == False
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
     
-    if not notifications:
+    count = result.rowcount
+    if not count:
         return {"message": "No unread notifications found"}
     
-    count = 0
-    for notification in notifications:
-        notification.is_read = True
-        count += 1
-    
-    db.commit()
-    
     return {"message": f"{count} notifications marked as read"}
\ No newline at end of file
@@ -1 +1 @@
-from .database import Base, engine , get_db , SessionLocal 
+from .database import Base, get_engine , get_async_engine , get_db , SessionLocal , get_async_db , AsyncSessionLocal
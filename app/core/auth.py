@@ -1,18 +1,48 @@
+import os
+import threading
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.cache import make_cache
 
 # Security configuration
 SECRET_KEY = "YOUR_SECRET_KEY_HERE"  # In production, use a proper secret key
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Authenticated principals by username, so protected requests skip the users
+# lookup. Committed user changes evict the entry from the cache of the worker
+# that made them. With the memory backend the other workers keep serving
+# their copy until it expires, so a deactivation or role change can take up
+# to PRINCIPAL_CACHE_TTL_SECONDS to reach them; the sqlite backend is shared
+# by every worker on the host and evicts for all of them at once.
+PRINCIPAL_CACHE_BACKEND = os.getenv("PRINCIPAL_CACHE_BACKEND", "memory")  # memory, sqlite or none
+PRINCIPAL_CACHE_PATH = os.getenv("PRINCIPAL_CACHE_PATH", "storage/principal_cache.sqlite3")
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+_principal_cache = None
+_principal_cache_lock = threading.Lock()
+
+def get_principal_cache():
+    # Built on first use so importing the app opens no files
+    global _principal_cache
+    if _principal_cache is None:
+        with _principal_cache_lock:
+            if _principal_cache is None:
+                _principal_cache = make_cache(
+                    PRINCIPAL_CACHE_BACKEND, PRINCIPAL_CACHE_PATH, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+                ) or False
+    return _principal_cache or None
+
 # Password hashing utilities
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
@@ -33,7 +63,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -52,12 +82,66 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
         
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
+    cache = get_principal_cache()
+    cached = cache.get(token_data.username) if cache is not None else None
+    if cached is not None:
+        return schemas.User.model_validate(cached)
+        
+    user = await db.scalar(select(models.User).where(models.User.username == token_data.username))
     if user is None:
         raise credentials_exception
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return user
+    
+    # Cache a detached snapshot rather than the ORM object bound to this request's session
+    principal = schemas.User.model_validate(user)
+    if cache is not None:
+        # As JSON, which the shared backend requires
+        cache.set(user.username, principal.model_dump(mode="json"))
+    return principal
+
+def invalidate_principal(username: str):
+    cache = get_principal_cache()
+    if cache is not None:
+        cache.delete(username)
+
+def clear_principals():
+    cache = get_principal_cache()
+    if cache is not None:
+        cache.clear()
+
+def principal_cache_stats():
+    cache = get_principal_cache()
+    return {"backend": PRINCIPAL_CACHE_BACKEND, **(cache.stats() if cache is not None else {})}
+
+# Any committed change to a user (approval, role, deactivation, rename, deletion) drops its cached principal
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _queue_principal_invalidation(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        # A rename must also drop the entry cached under the old username
+        usernames = {target.username, *inspect(target).attrs.username.history.deleted}
+        session.info.setdefault("stale_principals", set()).update(usernames)
+
+@event.listens_for(Session, "do_orm_execute")
+def _queue_bulk_principal_invalidation(orm_execute_state):
+    # Bulk UPDATE/DELETE statements bypass the mapper events and can hit any user
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.statement.table.name == models.User.__tablename__:
+            orm_execute_state.session.info["stale_principals_all"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    if session.info.pop("stale_principals_all", False):
+        clear_principals()
+    for username in session.info.pop("stale_principals", ()):
+        invalidate_principal(username)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_invalidations(session):
+    session.info.pop("stale_principals", None)
+    session.info.pop("stale_principals_all", None)
 
 def get_current_active_user(current_user: schemas.User = Depends(get_current_user)):
     return current_user
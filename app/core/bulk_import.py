@@ -0,0 +1,190 @@
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import models
+from app.core.pipeline import record_transitions, transition
+
+# Bulk candidate import from CSV or NDJSON. Input is consumed line by line,
+# job IDs are checked against a set loaded once up front, and valid rows are
+# inserted with one executemany per batch, each batch in its own transaction.
+# Anything wrong with a single row, including bytes that aren't UTF-8, is
+# reported as that row's error; the rest of the file is still imported.
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ("csv", "ndjson")
+
+class RecordError(ValueError):
+    """A row that can't be read; yielded by iter_records in place of the record."""
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith("ndjson"):
+        return "ndjson"
+    return "csv"
+
+def _decode(lines: Iterable[bytes], failures: Dict[int, str]) -> Iterator[str]:
+    # Undecodable lines are replaced and recorded in `failures` by line number
+    for number, line in enumerate(lines, start=1):
+        encoding = "utf-8-sig" if number == 1 else "utf-8"
+        try:
+            yield line.decode(encoding)
+        except UnicodeDecodeError as e:
+            failures[number] = f"Not valid UTF-8: {e.reason} at byte {e.start}"
+            yield line.decode(encoding, errors="replace")
+
+def iter_records(lines: Iterable[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, record) pairs from raw lines; unreadable rows yield a RecordError."""
+    failures: Dict[int, str] = {}
+    decoded = _decode(lines, failures)
+    if fmt == "csv":
+        reader = csv.DictReader(decoded)
+        if reader.fieldnames is None:
+            return
+        if 1 in failures:
+            yield 1, RecordError(f"Header: {failures[1]}")
+            return
+        last = reader.line_num
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield last + 1, RecordError(f"Invalid CSV: {e}")
+            else:
+                # A quoted field can span lines; the record fails if any of them did
+                broken = [failures[number] for number in range(last + 1, reader.line_num + 1) if number in failures]
+                yield last + 1, RecordError(broken[0]) if broken else record
+            last = reader.line_num
+    elif fmt == "ndjson":
+        for number, line in enumerate(decoded, start=1):
+            if number in failures:
+                yield number, RecordError(failures[number])
+                continue
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, RecordError(f"Invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unknown format '{fmt}'. Must be one of: {', '.join(FORMATS)}")
+
+def _text(record: Dict[str, Any], field: str) -> str:
+    value = record.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    if "\x00" in value:
+        raise ValueError(f"{field} contains a NUL character")
+    return value.strip()
+
+def _validate(record: Any, job_ids: set) -> Dict[str, Any]:
+    if isinstance(record, RecordError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    name = _text(record, "name")
+    email = _text(record, "email")
+    if not name or not email:
+        raise ValueError("name and email are required")
+
+    job_id = record.get("job_id")
+    if isinstance(job_id, str) and job_id.strip().isdigit():
+        job_id = int(job_id)
+    if isinstance(job_id, bool) or not isinstance(job_id, int):
+        raise ValueError("job_id must be an integer")
+    if job_id not in job_ids:
+        raise ValueError(f"Job {job_id} not found")
+
+    status = _text(record, "status") or "Applied"
+    if status not in models.CANDIDATE_STATUSES:
+        raise ValueError(f"Invalid status '{status}'")
+
+    return {"name": name, "email": email, "cv_text": _text(record, "cv_text"), "status": status, "job_id": job_id}
+
+class _BatchReader:
+    """Pulls validated rows off a record iterator one batch at a time."""
+
+    def __init__(self, records: Iterable[Tuple[int, Any]], job_ids: set, report: Dict[str, Any]):
+        self.records = iter(records)
+        self.job_ids = job_ids
+        self.report = report
+        self.number = 0
+        self.done = False
+
+    def next_batch(self, size: int) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """Up to `size` valid rows and their row numbers; invalid rows go to the report."""
+        rows: List[Dict[str, Any]] = []
+        numbers: List[int] = []
+        try:
+            while len(rows) < size:
+                try:
+                    self.number, record = next(self.records)
+                except StopIteration:
+                    self.done = True
+                    break
+                try:
+                    rows.append(_validate(record, self.job_ids))
+                except Exception as e:
+                    self.report["failed"] += 1
+                    _add_error(self.report, self.number, str(e) if isinstance(e, ValueError) else f"Invalid record: {e!r}")
+                    continue
+                numbers.append(self.number)
+        except Exception as e:
+            # Earlier batches are committed; report where reading stopped instead of losing the report
+            _add_error(self.report, self.number + 1, f"Import stopped, input could not be read: {e}")
+            self.done = True
+        return rows, numbers
+
+def _job_ids(db: Session) -> set:
+    return {job_id for (job_id,) in db.query(models.JobPosting.id)}
+
+def _insert_batch(db: Session, rows: List[Dict[str, Any]], numbers: List[int], report: Dict[str, Any]):
+    if not rows:
+        return
+    try:
+        inserted = db.execute(
+            insert(models.Candidate).returning(models.Candidate.id, models.Candidate.job_id, models.Candidate.status),
+            rows,
+        )
+        record_transitions(db, [transition(candidate_id, job_id, None, status) for candidate_id, job_id, status in inserted])
+        db.commit()
+        report["inserted"] += len(rows)
+    except Exception as e:
+        db.rollback()
+        report["failed"] += len(rows)
+        _add_error(report, numbers[0], f"Batch of {len(rows)} rows starting here was rolled back: {e}")
+
+def _new_report() -> Dict[str, Any]:
+    return {"inserted": 0, "failed": 0, "errors": []}
+
+def import_candidates(db: Session, records: Iterable[Tuple[int, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Validate and insert candidates in batches; returns a per-row error report."""
+    report = _new_report()
+    reader = _BatchReader(records, _job_ids(db), report)
+    while not reader.done:
+        rows, numbers = reader.next_batch(batch_size)
+        _insert_batch(db, rows, numbers, report)
+    return report
+
+async def import_candidates_async(db: AsyncSession, records: Iterable[Tuple[int, Any]],
+                                  batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """`import_candidates` on an AsyncSession; reading and validating run in the threadpool."""
+    report = _new_report()
+    reader = _BatchReader(records, await db.run_sync(_job_ids), report)
+    while not reader.done:
+        rows, numbers = await run_in_threadpool(reader.next_batch, batch_size)
+        await db.run_sync(_insert_batch, rows, numbers, report)
+    return report
+
+def _add_error(report: Dict[str, Any], row: int, error: str):
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row, "error": error})
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Sync routes run in the threadpool, so every operation takes the lock.
+    Hit/miss/eviction counters are kept for the stats endpoints.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class SQLiteTTLCache:
+    """TTLCache with the same interface, kept in a SQLite file.
+
+    Every worker process opening the same file shares the entries, so an
+    invalidation in one worker is seen by all of them. It stands in for a
+    networked cache on single-host deployments. Values must be JSON
+    serialisable; counters are per process.
+    """
+
+    def __init__(self, path: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_used ON cache (used)")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        # Wall clock, not monotonic: expiry times are shared between processes
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM cache WHERE key = ?", (str(key),)).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (str(key),))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET used = ? WHERE key = ?", (now, str(key)))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                (str(key), json.dumps(value, default=str), now + self.ttl, now),
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.maxsize
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used LIMIT ?)", (excess,)
+                )
+                self.evictions += excess
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (str(key),))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "size": size,
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+CACHE_BACKENDS = ("memory", "sqlite", "none")
+
+def make_cache(backend: str, path: str, maxsize: int, ttl: float):
+    """A per-process TTLCache, a SQLiteTTLCache at `path` shared by the workers on a host, or None for "none"."""
+    if backend == "memory":
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+    if backend == "sqlite":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return SQLiteTTLCache(path, maxsize=maxsize, ttl=ttl)
+    if backend == "none":
+        return None
+    raise ValueError(f"Invalid cache backend '{backend}'. Must be one of: {', '.join(CACHE_BACKENDS)}")
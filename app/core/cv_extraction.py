@@ -0,0 +1,144 @@
+import asyncio
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from xml.etree import ElementTree
+from sqlalchemy import select, update
+from app import models
+from app.core.database import AsyncSessionLocal
+from app.core.storage import HEAD_BYTES, cap_cv_text, cv_store
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # PDF extraction is optional
+    PdfReader = None
+
+# Text extraction for binary CVs. Parsing is CPU-bound, so it runs in a
+# process pool after the upload response has been sent; the candidate's
+# cv_extraction_status tracks progress and cv_text is filled in when done.
+#
+# Queued extractions live only in the process that queued them, so on
+# startup every worker re-queues what was left pending or processing. Each
+# run first claims its row (pending -> processing), so a row is only picked
+# up once per re-queue; a worker restarting next to a live one may redo an
+# extraction that one is still running, which writes the same text again.
+EXTRACTION_WORKERS = int(os.getenv("CV_EXTRACTION_WORKERS", "2"))
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+DOCX_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+        _pool = None
+
+def _extract_pdf(path: str) -> str:
+    if PdfReader is None:
+        raise RuntimeError("PDF extraction requires the pypdf package")
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+def _extract_docx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{DOCX_NAMESPACE}p"):
+        paragraphs.append("".join(node.text or "" for node in paragraph.iter(f"{DOCX_NAMESPACE}t")))
+    return "\n".join(p for p in paragraphs if p)
+
+def _document_format(head: bytes, content_type: Optional[str], filename: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    content_type = content_type or ""
+    if head.startswith(b"%PDF") or content_type == "application/pdf" or name.endswith(".pdf"):
+        return "pdf"
+    if head.startswith(b"PK") and (name.endswith(".docx") or "wordprocessingml" in content_type):
+        return "docx"
+    return None
+
+def is_document(head: bytes, content_type: Optional[str], filename: Optional[str]) -> bool:
+    """Whether an upload needs text extraction, even if its bytes happen to decode as UTF-8 (an ASCII-only PDF does)."""
+    # PK: a zip container, never a plain-text CV
+    return head.startswith(b"PK") or _document_format(head, content_type, filename) is not None
+
+def extract_text(path: str, content_type: Optional[str], filename: Optional[str]) -> str:
+    """Extract plain text from a stored CV. Runs inside a pool worker process."""
+    with open(path, "rb") as f:
+        head = f.read(HEAD_BYTES)
+
+    document_format = _document_format(head, content_type, filename)
+    if document_format == "pdf":
+        return _extract_pdf(path)
+    if document_format == "docx":
+        return _extract_docx(path)
+    raise ValueError(f"Unsupported CV format: {filename or content_type or 'unknown'}")
+
+async def _set_status(candidate_id: int, **values):
+    async with AsyncSessionLocal() as db:
+        candidate = await db.get(models.Candidate, candidate_id)
+        if candidate is None:
+            return
+        for key, value in values.items():
+            setattr(candidate, key, value)
+        await db.commit()
+
+async def _claim(candidate_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        claimed = await db.execute(
+            update(models.Candidate)
+            .where(models.Candidate.id == candidate_id, models.Candidate.cv_extraction_status == PENDING)
+            .values(cv_extraction_status=PROCESSING)
+        )
+        await db.commit()
+        return claimed.rowcount == 1
+
+async def run_extraction(candidate_id: int, path: str, content_type: Optional[str], filename: Optional[str]):
+    """Background task: extract a candidate's CV text off the request path."""
+    if not await _claim(candidate_id):
+        # Already taken by another run, or the candidate is gone
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        text = await loop.run_in_executor(get_pool(), extract_text, path, content_type, filename)
+    except Exception as e:
+        await _set_status(candidate_id, cv_extraction_status=FAILED, cv_extraction_error=str(e) or type(e).__name__)
+        return
+    await _set_status(candidate_id, cv_text=cap_cv_text(text), cv_extraction_status=DONE, cv_extraction_error=None)
+
+async def requeue_unfinished() -> int:
+    """Run the extractions a previous process left pending or processing; returns how many were queued."""
+    Candidate = models.Candidate
+    async with AsyncSessionLocal() as db:
+        # Their pool went away with the process that queued them
+        await db.execute(
+            update(Candidate).where(Candidate.cv_extraction_status == PROCESSING).values(cv_extraction_status=PENDING)
+        )
+        rows = (await db.execute(
+            select(Candidate.id, Candidate.cv_sha256, Candidate.cv_content_type, Candidate.cv_filename)
+            .where(Candidate.cv_extraction_status == PENDING, Candidate.cv_sha256.is_not(None))
+            .order_by(Candidate.id)
+        )).all()
+        await db.commit()
+
+    # No more at once than the pool runs
+    slots = asyncio.Semaphore(EXTRACTION_WORKERS)
+
+    async def run(candidate_id, sha256, content_type, filename):
+        async with slots:
+            await run_extraction(candidate_id, cv_store.path_for(sha256), content_type, filename)
+
+    await asyncio.gather(*(run(*row) for row in rows))
+    return len(rows)
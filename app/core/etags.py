@@ -0,0 +1,130 @@
+import hashlib
+import os
+from typing import Callable, Dict, Iterable, List
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.replicas import get_async_read_db
+from app.models.base import Candidate, EntityVersion, JobPosting
+
+# Conditional GETs. Every committed write to a tracked table bumps that
+# table's counter in entity_versions inside the same transaction, and read
+# endpoints derive their ETag from the counters they depend on.
+#
+# The counters are read on the route's own get_async_read_db session, before
+# the route reads its data, so both come from the same database: the replica
+# the session is bound to, or the primary when the client's reads are pinned
+# there. A replica applies commits in order, so data read after the counter
+# is never older than the counter says; at worst a client gets a newer body
+# under an older ETag and refetches once.
+#
+# Counters are cached in process per database for ETAG_VERSION_TTL_SECONDS,
+# so a matching If-None-Match is answered with 304 without a query. Writes
+# made by this process drop the cached values straight away, and the TTL
+# bounds how long another worker's write can go unnoticed.
+ETAG_VERSION_TTL_SECONDS = float(os.getenv("ETAG_VERSION_TTL_SECONDS", "1"))
+
+TRACKED_TABLES = (JobPosting.__tablename__, Candidate.__tablename__)
+
+_versions = TTLCache(maxsize=256, ttl=ETAG_VERSION_TTL_SECONDS)
+
+def current_versions(db: Session, tables: Iterable[str]) -> Dict[str, int]:
+    """Version counters of `tables` as seen by the database `db` is bound to."""
+    # Never mix counters of one replica with data of another
+    database = db.get_bind().url.render_as_string(hide_password=True)
+    tables = list(tables)
+    found = {table: _versions.get((database, table)) for table in tables}
+    missing = [table for table, version in found.items() if version is None]
+    if missing:
+        rows = dict(db.execute(
+            select(EntityVersion.collection, EntityVersion.version).where(EntityVersion.collection.in_(missing))
+        ).all())
+        for table in missing:
+            found[table] = rows.get(table, 0)
+            _versions.set((database, table), found[table])
+    return found
+
+def make_etag(db: Session, tables: Iterable[str], request: Request) -> str:
+    versions = current_versions(db, tables)
+    # The same version serves different pages, field sets and filters
+    variant = hashlib.sha1(f"{request.url.path}?{sorted(request.query_params.multi_items())}".encode()).hexdigest()[:12]
+    return '"' + "-".join(f"{table}.{version}" for table, version in sorted(versions.items())) + f"-{variant}" + '"'
+
+def _if_none_match(header: str) -> List[str]:
+    # Weak and strong forms compare equal for GET revalidation
+    tags = [tag.strip() for tag in header.split(",")] if header else []
+    return [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+def conditional(*tables: str) -> Callable[[Request, Response], str]:
+    """Dependency that sets an ETag and answers 304 when the client's copy is current.
+
+    Declare it after the auth dependency so unauthorised clients get their 401/403.
+    The route must take its session from get_async_read_db: FastAPI then hands both
+    the same session, so the ETag describes the database the data is read from.
+    """
+
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)) -> str:
+        etag = await db.run_sync(make_etag, tables, request)
+        tags = _if_none_match(request.headers.get("if-none-match", ""))
+        if etag in tags or "*" in tags:
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return etag
+
+    return dependency
+
+def touch(session, collection: str):
+    """Have the session's next commit bump `collection`'s counter."""
+    session.info.setdefault("touched_tables", set()).add(collection)
+
+def _touch(session, table: str):
+    if table in TRACKED_TABLES:
+        touch(session, table)
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            _touch(session, table)
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _touch(orm_execute_state.session, orm_execute_state.statement.table.name)
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    # The versions this commit produced, for after_commit listeners (see app.core.matching)
+    session.info["bumped_versions"] = {}
+    if session.info.get("read_only"):
+        return
+    # Pending changes flush during commit; flush them now so they are counted
+    session.flush()
+    touched = session.info.get("touched_tables")
+    if not touched:
+        return
+    # Straight on the connection, so these statements are not tracked themselves
+    connection = session.connection()
+    for table in sorted(touched):
+        bumped = connection.execute(
+            update(EntityVersion).where(EntityVersion.collection == table).values(version=EntityVersion.version + 1)
+        )
+        if not bumped.rowcount:
+            connection.execute(insert(EntityVersion).values(collection=table, version=1))
+        # The row stays locked until commit, so this is our own version
+        session.info["bumped_versions"][table] = connection.scalar(
+            select(EntityVersion.version).where(EntityVersion.collection == table)
+        )
+
+@event.listens_for(Session, "after_commit")
+def _expire_cached_versions(session):
+    # Cached per database, and a replica may already have the write
+    if session.info.pop("touched_tables", None):
+        _versions.clear()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_touched_tables(session):
+    session.info.pop("touched_tables", None)
@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.base import Notification
+
+# In-process pub/sub for pushing notifications to connected clients.
+# Publishers may run in the threadpool (sync routes) or on the event loop;
+# delivery always hops onto the subscriber's loop. Each subscriber has a
+# bounded queue and a slow client loses its oldest events, never blocks
+# publishers.
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+class Subscription:
+    def __init__(self, bus: "EventBus", candidate_id: Optional[int]):
+        self.bus = bus
+        self.candidate_id = candidate_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        return self.candidate_id is None or event.get("candidate_id") == self.candidate_id
+
+    def deliver(self, event: Dict[str, Any]):
+        # Runs on the subscriber's loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class EventBus:
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self, candidate_id: Optional[int] = None) -> Subscription:
+        """Subscribe from a coroutine; optionally only to one candidate's events."""
+        subscription = Subscription(self, candidate_id)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: Dict[str, Any]):
+        """Fan an event out to matching subscribers; safe to call from any thread."""
+        event = {"id": next(self._ids), **event}
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.wants(event)]
+            self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Subscriber's loop is closed
+                self.unsubscribe(subscription)
+
+event_bus = EventBus()
+
+def notification_event(candidate_id: int, type: str, message: str, notification_id: Optional[int] = None,
+                       created_at: Optional[datetime] = None) -> Dict[str, Any]:
+    return {
+        "type": type,
+        "candidate_id": candidate_id,
+        "message": message,
+        "notification_id": notification_id,
+        "created_at": (created_at or datetime.utcnow()).isoformat(),
+    }
+
+# Every Notification written through the ORM is published once its
+# transaction commits, so clients never see events that were rolled back.
+
+@event.listens_for(Session, "after_flush")
+def _capture_notifications(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Notification):
+            session.info.setdefault("notification_events", []).append(
+                notification_event(obj.candidate_id, obj.type, obj.message, obj.id, obj.created_at)
+            )
+
+@event.listens_for(Session, "after_commit")
+def _publish_notifications(session):
+    for item in session.info.pop("notification_events", ()):
+        event_bus.publish(item)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_notifications(session):
+    session.info.pop("notification_events", None)
@@ -0,0 +1,37 @@
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy.orm import load_only
+
+# Sparse fieldsets for list endpoints: `?fields=id,name` or `?fields=summary`.
+# The selection is pushed into the SELECT with load_only, so unrequested
+# Text columns (cv_text, description) are never read from the database.
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], summary: Sequence[str]) -> Optional[List[str]]:
+    """Turn a `fields` query value into column names, or None for full rows."""
+    if not fields:
+        return None
+
+    names = ["id"]
+    for name in (part.strip() for part in fields.split(",")):
+        if not name:
+            continue
+        if name == "summary":
+            expanded = list(summary)
+        elif name in allowed:
+            expanded = [name]
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field '{name}'. Must be 'summary' or one of: {', '.join(allowed)}"
+            )
+        names.extend(n for n in expanded if n not in names)
+    return names
+
+def load_fields(model, names: Sequence[str]):
+    return load_only(*[getattr(model, name) for name in names])
+
+def project(rows: Sequence[Any], names: Optional[Sequence[str]]) -> List[Any]:
+    """Reduce loaded rows to the requested fields; full rows pass through."""
+    if names is None:
+        return list(rows)
+    return [{name: getattr(row, name) for name in names} for row in rows]
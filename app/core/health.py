@@ -0,0 +1,89 @@
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from app.core.database import get_engine
+
+# Database health is probed in the background and the last result is served
+# from memory, so load balancers polling /health on every worker add no
+# database load of their own.
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "5"))
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+# A cached result older than this many intervals means the prober is stuck
+HEALTH_CHECK_STALE_INTERVALS = float(os.getenv("HEALTH_CHECK_STALE_INTERVALS", "3"))
+
+CONNECTED = "Database connected"
+NOT_CONNECTED = "Database not connected"
+
+class HealthProber:
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL_SECONDS, timeout: float = HEALTH_CHECK_TIMEOUT_SECONDS):
+        self.interval = interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._last: Optional[Dict[str, Any]] = None
+        self._checked_monotonic = 0.0
+
+    def _record(self, ok: bool, latency: float, error: Optional[str] = None) -> Dict[str, Any]:
+        result = {
+            "status": CONNECTED if ok else NOT_CONNECTED,
+            "latency_ms": round(latency * 1000, 3),
+            "checked_at": datetime.utcnow().isoformat(),
+            "error": error,
+        }
+        with self._lock:
+            self._last = result
+            self._checked_monotonic = time.monotonic()
+        return result
+
+    def probe(self) -> Dict[str, Any]:
+        """Run `SELECT 1` on the primary and cache the outcome."""
+        start = time.perf_counter()
+        try:
+            with get_engine().connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            # Some exceptions have an empty message
+            return self._record(False, time.perf_counter() - start, (str(e).splitlines() or [type(e).__name__])[0])
+        return self._record(True, time.perf_counter() - start)
+
+    async def probe_async(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(run_in_threadpool(self.probe), self.timeout)
+        except asyncio.TimeoutError:
+            return self._record(False, time.perf_counter() - start, f"timed out after {self.timeout}s")
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Last cached result with its age, or None before the first probe.
+
+        A result older than HEALTH_CHECK_STALE_INTERVALS intervals is reported
+        as not connected: the background probe has stopped updating it.
+        """
+        with self._lock:
+            if self._last is None:
+                return None
+            result = dict(self._last)
+            age = time.monotonic() - self._checked_monotonic
+        result["age_seconds"] = round(age, 3)
+        if self.interval > 0 and age > self.interval * HEALTH_CHECK_STALE_INTERVALS:
+            result["status"] = NOT_CONNECTED
+            result["error"] = f"no probe result for {age:.0f}s"
+        return result
+
+    async def run(self):
+        """Background task started with the app."""
+        while True:
+            try:
+                await self.probe_async()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep probing; a failed probe must not stop the loop
+                self._record(False, 0.0, f"probe failed: {e!r}")
+            await asyncio.sleep(self.interval)
+
+health_prober = HealthProber()
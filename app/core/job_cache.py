@@ -0,0 +1,52 @@
+import os
+import threading
+from typing import Any, Awaitable, Callable
+from app.core.cache import make_cache
+
+# Read-through cache for job posting reads. Entries are keyed by the
+# request's ETag, which already combines the jobs version counter with the
+# path and query string, so a write makes old entries unreachable on its own;
+# create/update/delete also clear the cache so they don't linger until they
+# expire. The memory backend is per worker, the sqlite backend is shared by
+# every worker on the host.
+#
+# Only fill the cache with data read on the same session the ETag was
+# computed from (see app.core.etags): the version in the key was then read
+# before the data on the same database, so an entry is never older than its
+# key claims, whichever replica served it.
+JOB_CACHE_BACKEND = os.getenv("JOB_CACHE_BACKEND", "memory")  # memory, sqlite or none
+JOB_CACHE_PATH = os.getenv("JOB_CACHE_PATH", "storage/job_cache.sqlite3")
+JOB_CACHE_SIZE = int(os.getenv("JOB_CACHE_SIZE", "512"))
+JOB_CACHE_TTL_SECONDS = float(os.getenv("JOB_CACHE_TTL_SECONDS", "300"))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_job_cache():
+    # Built on first use so importing the app opens no files
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = make_cache(JOB_CACHE_BACKEND, JOB_CACHE_PATH, JOB_CACHE_SIZE, JOB_CACHE_TTL_SECONDS) or False
+    return _cache or None
+
+async def cached(key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+    """Return the cached value for `key`, awaiting `load` on a miss; values must be JSON serialisable."""
+    cache = get_job_cache()
+    if cache is None:
+        return await load()
+    value = cache.get(key)
+    if value is None:
+        value = await load()
+        cache.set(key, value)
+    return value
+
+def invalidate():
+    cache = get_job_cache()
+    if cache is not None:
+        cache.clear()
+
+def stats():
+    cache = get_job_cache()
+    return {"backend": JOB_CACHE_BACKEND, **(cache.stats() if cache is not None else {})}
@@ -0,0 +1,448 @@
+import asyncio
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.etags import current_versions, touch
+from app.models.base import Candidate, JobPosting
+
+# Candidate <-> job matching.
+#
+# Candidates' CV text and jobs' skills are kept as sparse term-frequency rows
+# in CSR form (indptr/indices/data NumPy arrays). A query is scored against
+# every row at once: TF-IDF cosine similarity plus the share of the job's
+# skill terms found in the CV, both computed with np.add.reduceat over the
+# CSR arrays. Rows are appended as candidates and jobs are written through
+# the ORM in this process.
+#
+# Writes from other workers, the CLI or bulk statements are noticed through
+# their own entity_versions counters (see app.core.etags), candidates.matched
+# and jobs.matched, which only commits changing MATCHED_COLUMNS bump: status
+# moves, extraction bookkeeping and interview bookings leave them alone. The
+# engine remembers the versions its index reflects, moves them forward for
+# its own commits, and rebuilds on the next ranking request when the
+# database is ahead of it. A rebuild reads into a fresh index without the
+# lock and swaps it in, replaying this process's commits that landed
+# meanwhile, so incremental updates and rankings never wait for one.
+
+SIMILARITY_WEIGHT = 0.7
+SKILL_OVERLAP_WEIGHT = 0.3
+
+# Columns the matrices are built from, per table
+MATCHED_COLUMNS = {
+    Candidate.__tablename__: {"job_id", "cv_text"},
+    JobPosting.__tablename__: {"title", "required_skills"},
+}
+
+# entity_versions counter of each matched table
+MATCHED_VERSIONS = {table: f"{table}.matched" for table in MATCHED_COLUMNS}
+
+# (table, id, matched column values or None when deleted)
+Change = Tuple[str, int, Optional[Tuple[Any, ...]]]
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    # Keeps terms such as c++, c#, node.js and 3d together
+    return TOKEN_RE.findall((text or "").lower())
+
+def _job_document(title: Optional[str], required_skills: Optional[str]) -> str:
+    return f"{title or ''} {required_skills or ''}"
+
+class TermMatrix:
+    """Append-only CSR term matrix; replaced or removed rows are masked out and compacted later."""
+
+    def __init__(self):
+        self._rows: List[Tuple[np.ndarray, np.ndarray]] = []  # (term indices, log tf)
+        self._keys: List[int] = []
+        self._groups: List[int] = []
+        self._alive: List[bool] = []
+        self._position: Dict[int, int] = {}
+        self._csr = None
+
+    def __len__(self):
+        return len(self._position)
+
+    def upsert(self, key: int, group: Optional[int], terms: np.ndarray, counts: np.ndarray):
+        self.remove(key)
+        self._position[key] = len(self._rows)
+        self._rows.append((terms, 1.0 + np.log(counts)))
+        self._keys.append(key)
+        self._groups.append(-1 if group is None else group)
+        self._alive.append(True)
+        self._csr = None
+
+    def remove(self, key: int):
+        position = self._position.pop(key, None)
+        if position is None:
+            return
+        self._alive[position] = False
+        self._csr = None
+        if len(self._alive) > 1024 and len(self._position) < len(self._alive) // 2:
+            self._compact()
+
+    def terms_of(self, key: int) -> Optional[np.ndarray]:
+        position = self._position.get(key)
+        return None if position is None else self._rows[position][0]
+
+    def _compact(self):
+        keep = [i for i, alive in enumerate(self._alive) if alive]
+        self._rows = [self._rows[i] for i in keep]
+        self._keys = [self._keys[i] for i in keep]
+        self._groups = [self._groups[i] for i in keep]
+        self._alive = [True] * len(keep)
+        self._position = {key: i for i, key in enumerate(self._keys)}
+
+    def csr(self):
+        """(indptr, indices, data, keys, groups, alive) for the current rows, rebuilt lazily."""
+        if self._csr is None:
+            lengths = np.fromiter((len(t) for t, _ in self._rows), dtype=np.int64, count=len(self._rows))
+            indptr = np.zeros(len(self._rows) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=indptr[1:])
+            if self._rows:
+                indices = np.concatenate([t for t, _ in self._rows])
+                data = np.concatenate([w for _, w in self._rows])
+            else:
+                indices = np.zeros(0, dtype=np.int64)
+                data = np.zeros(0, dtype=np.float64)
+            self._csr = (
+                indptr,
+                indices,
+                data,
+                np.asarray(self._keys, dtype=np.int64),
+                np.asarray(self._groups, dtype=np.int64),
+                np.asarray(self._alive, dtype=bool),
+            )
+        return self._csr
+
+def _row_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    # reduceat misbehaves on empty rows, so sum over non-empty rows only
+    sums = np.zeros(len(indptr) - 1, dtype=np.float64)
+    lengths = np.diff(indptr)
+    nonempty = lengths > 0
+    if values.size and nonempty.any():
+        sums[nonempty] = np.add.reduceat(values, indptr[:-1][nonempty])
+    return sums
+
+class TermIndex:
+    """Vocabulary, candidate document frequencies and the candidate and job term matrices."""
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.df = np.zeros(0, dtype=np.int64)  # document frequency over candidate CVs
+        self.candidates = TermMatrix()
+        self.jobs = TermMatrix()
+
+    def encode(self, text: Optional[str], grow: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        counts: Dict[int, int] = {}
+        for token in tokenize(text):
+            index = self.vocabulary.get(token)
+            if index is None:
+                if not grow:
+                    continue
+                index = self.vocabulary[token] = len(self.vocabulary)
+            counts[index] = counts.get(index, 0) + 1
+        if len(self.vocabulary) > len(self.df):
+            self.df = np.concatenate([self.df, np.zeros(len(self.vocabulary) - len(self.df), dtype=np.int64)])
+        terms = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        order = np.argsort(terms)
+        return terms[order], values[order]
+
+    def index_candidate(self, candidate_id: int, job_id: Optional[int], cv_text: Optional[str]):
+        self.remove_candidate(candidate_id)
+        terms, counts = self.encode(cv_text)
+        self.df[terms] += 1
+        self.candidates.upsert(candidate_id, job_id, terms, counts)
+
+    def remove_candidate(self, candidate_id: int):
+        terms = self.candidates.terms_of(candidate_id)
+        if terms is not None:
+            self.df[terms] -= 1
+            self.candidates.remove(candidate_id)
+
+    def index_job(self, job_id: int, title: Optional[str], required_skills: Optional[str]):
+        terms, counts = self.encode(_job_document(title, required_skills))
+        self.jobs.upsert(job_id, None, terms, counts)
+
+    def remove_job(self, job_id: int):
+        self.jobs.remove(job_id)
+
+    def apply(self, changes: List[Change]):
+        for table, key, values in changes:
+            if table == Candidate.__tablename__:
+                if values is None:
+                    self.remove_candidate(key)
+                else:
+                    self.index_candidate(key, *values)
+            elif values is None:
+                self.remove_job(key)
+            else:
+                self.index_job(key, *values)
+
+    def add_jobs(self, rows: Iterable[Tuple[int, Optional[str], Optional[str]]]):
+        for job_id, title, required_skills in rows:
+            self.index_job(job_id, title, required_skills)
+
+    def add_candidates(self, rows: Iterable[Tuple[int, Optional[int], Optional[str]]]):
+        for candidate_id, job_id, cv_text in rows:
+            self.index_candidate(candidate_id, job_id, cv_text)
+
+JOB_ROWS = select(JobPosting.id, JobPosting.title, JobPosting.required_skills).execution_options(yield_per=1000)
+CANDIDATE_ROWS = select(Candidate.id, Candidate.job_id, Candidate.cv_text).execution_options(yield_per=1000)
+
+class MatchingEngine:
+    def __init__(self):
+        # Guards the current index and versions. Rebuilds fill a new index
+        # without it and only take it to swap the result in.
+        self._lock = threading.RLock()
+        self._index = TermIndex()
+        self._rebuilds: List[list] = []  # commits applied while each running rebuild reads
+        self._rebuild_lock = asyncio.Lock()
+        self.loaded = False
+        self.versions: Dict[str, int] = {}  # matched-column counters the index reflects
+
+    @property
+    def candidates(self) -> TermMatrix:
+        return self._index.candidates
+
+    @property
+    def jobs(self) -> TermMatrix:
+        return self._index.jobs
+
+    @property
+    def tracking(self) -> bool:
+        """Whether commits of this process need their changes captured."""
+        return self.loaded or bool(self._rebuilds)
+
+    def stale(self, versions: Dict[str, int]) -> bool:
+        with self._lock:
+            return not self.loaded or versions != self.versions
+
+    # Loading
+
+    def load(self, db: Session):
+        """Build the index from the database, or rebuild it if another process changed the matched columns."""
+        # Read before the rows, so the index is never older than these versions
+        versions = current_versions(db, MATCHED_VERSIONS.values())
+        if not self.stale(versions):
+            return
+        index, replay = TermIndex(), self._start_rebuild()
+        try:
+            for rows in db.execute(JOB_ROWS).partitions():
+                index.add_jobs(rows)
+            for rows in db.execute(CANDIDATE_ROWS).partitions():
+                index.add_candidates(rows)
+        except BaseException:
+            self._abandon_rebuild(replay)
+            raise
+        self._finish_rebuild(replay, index, versions)
+
+    async def load_async(self, db: AsyncSession):
+        """load() for async routes: rows are streamed and indexed in the threadpool, off the event loop."""
+        versions = await db.run_sync(current_versions, MATCHED_VERSIONS.values())
+        if not self.stale(versions):
+            return
+        # One rebuild at a time; requests queued behind it usually find it current
+        async with self._rebuild_lock:
+            if not self.stale(versions):
+                return
+            index, replay = TermIndex(), self._start_rebuild()
+            try:
+                for statement, add in ((JOB_ROWS, index.add_jobs), (CANDIDATE_ROWS, index.add_candidates)):
+                    result = await db.stream(statement)
+                    async for rows in result.partitions():
+                        await run_in_threadpool(add, rows)
+            except BaseException:
+                self._abandon_rebuild(replay)
+                raise
+            self._finish_rebuild(replay, index, versions)
+
+    def _start_rebuild(self) -> list:
+        replay = []
+        with self._lock:
+            self._rebuilds.append(replay)
+        return replay
+
+    def _abandon_rebuild(self, replay: list):
+        with self._lock:
+            self._rebuilds.remove(replay)
+
+    def _finish_rebuild(self, replay: list, index: TermIndex, versions: Dict[str, int]):
+        with self._lock:
+            self._rebuilds.remove(replay)
+            # Commits of this process that landed while the rows were read.
+            # Replaying one the rows already include rewrites the same values.
+            for changes, _ in replay:
+                index.apply(changes)
+            self._index = index
+            self.versions = dict(versions)
+            self.loaded = True
+            for _, bumped in replay:
+                self._advance(bumped)
+
+    # Incremental updates
+
+    def apply(self, changes: List[Change], bumped: Dict[str, int]):
+        """Apply a commit of this process; `bumped` holds the matched-column versions it produced."""
+        with self._lock:
+            if self.loaded:
+                self._index.apply(changes)
+                self._advance(bumped)
+            for replay in self._rebuilds:
+                replay.append((changes, bumped))
+
+    def _advance(self, bumped: Dict[str, int]):
+        for collection, version in bumped.items():
+            # Anything else committed in between forces a rebuild on the next load
+            if collection in self.versions and self.versions[collection] == version - 1:
+                self.versions[collection] = version
+
+    def invalidate(self):
+        """Forget everything; the next request reloads from the database."""
+        with self._lock:
+            self._index = TermIndex()
+            self.loaded = False
+            self.versions = {}
+
+    # Scoring
+
+    def _idf(self) -> np.ndarray:
+        n = len(self.candidates)
+        return np.log((1.0 + n) / (1.0 + self._index.df)) + 1.0
+
+    def _score(self, matrix: TermMatrix, query_terms, query_tf, skill_terms, skill_count: int, skills_in_rows: bool):
+        indptr, indices, data, keys, groups, alive = matrix.csr()
+        idf = self._idf()
+
+        query = np.zeros(len(self._index.vocabulary), dtype=np.float64)
+        query[query_terms] = (1.0 + np.log(query_tf)) * idf[query_terms]
+        query_norm = np.sqrt(np.dot(query, query))
+
+        weights = data * idf[indices]
+        dots = _row_sums(weights * query[indices], indptr)
+        norms = np.sqrt(_row_sums(weights * weights, indptr))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = np.where(norms * query_norm > 0, dots / (norms * query_norm), 0.0)
+
+        if skills_in_rows:
+            # Ranking jobs: share of each job's terms present in the query CV
+            present = np.zeros(len(self._index.vocabulary), dtype=np.float64)
+            present[query_terms] = 1.0
+            lengths = np.diff(indptr).astype(np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                overlap = np.where(lengths > 0, _row_sums(present[indices], indptr) / lengths, 0.0)
+        else:
+            # Ranking candidates: share of the job's terms present in each CV
+            wanted = np.zeros(len(self._index.vocabulary), dtype=np.float64)
+            wanted[skill_terms] = 1.0
+            overlap = _row_sums(wanted[indices], indptr) / skill_count if skill_count else np.zeros(len(keys))
+
+        scores = SIMILARITY_WEIGHT * similarity + SKILL_OVERLAP_WEIGHT * overlap
+        return keys, groups, alive, scores, similarity, overlap
+
+    @staticmethod
+    def _top_k(keys, mask, scores, similarity, overlap, k: int) -> List[dict]:
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+        if candidates.size > k:
+            # O(n) selection of the k best, then sort only those
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.lexsort((keys[candidates], -scores[candidates]))]
+        return [
+            {
+                "id": int(keys[i]),
+                "score": round(float(scores[i]), 6),
+                "similarity": round(float(similarity[i]), 6),
+                "skill_overlap": round(float(overlap[i]), 6),
+            }
+            for i in candidates
+        ]
+
+    def rank_candidates(self, title: str, required_skills: str, k: int = 20, job_id: Optional[int] = None) -> List[dict]:
+        """Top-k candidates for a job; restricted to the job's applicants when job_id is given."""
+        with self._lock:
+            terms, tf = self._index.encode(_job_document(title, required_skills), grow=False)
+            skill_terms, _ = self._index.encode(required_skills, grow=False)
+            # Skills no CV mentions still count against the overlap
+            skill_count = len(set(tokenize(required_skills)))
+            keys, groups, alive, scores, similarity, overlap = self._score(self.candidates, terms, tf, skill_terms, skill_count, False)
+            mask = alive if job_id is None else alive & (groups == job_id)
+            return self._top_k(keys, mask, scores, similarity, overlap, k)
+
+    def rank_jobs(self, candidate_id: int, k: int = 20) -> List[dict]:
+        """Top-k jobs for an indexed candidate's CV."""
+        with self._lock:
+            indptr, indices, data, _, _, _ = self.candidates.csr()
+            position = self.candidates._position.get(candidate_id)
+            if position is None:
+                return []
+            start, end = indptr[position], indptr[position + 1]
+            terms = indices[start:end]
+            tf = np.exp(data[start:end] - 1.0)
+            keys, _, alive, scores, similarity, overlap = self._score(self.jobs, terms, tf, terms, len(terms), True)
+            return self._top_k(keys, alive, scores, similarity, overlap, k)
+
+matching_engine = MatchingEngine()
+
+# Incremental maintenance: capture changed rows at flush time, apply them
+# once the transaction commits, drop them on rollback.
+
+def _changed(obj, *attributes) -> bool:
+    state = inspect(obj)
+    return state.pending or any(state.attrs[name].history.has_changes() for name in attributes)
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session, flush_context):
+    changes: List[Change] = []
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Candidate) and _changed(obj, "job_id", "cv_text"):
+            changes.append((Candidate.__tablename__, obj.id, (obj.job_id, obj.cv_text)))
+        elif isinstance(obj, JobPosting) and _changed(obj, "title", "required_skills"):
+            changes.append((JobPosting.__tablename__, obj.id, (obj.title, obj.required_skills)))
+    for obj in session.deleted:
+        if isinstance(obj, (Candidate, JobPosting)):
+            changes.append((obj.__tablename__, obj.id, None))
+    for table in {table for table, _, _ in changes}:
+        touch(session, MATCHED_VERSIONS[table])
+    if changes and matching_engine.tracking:
+        session.info.setdefault("matching_changes", []).extend(changes)
+
+@event.listens_for(Session, "do_orm_execute")
+def _capture_statement(orm_execute_state):
+    # Bulk statements bypass the flush hooks; they bump the counter without
+    # being applied here, so the versions fall behind and the next load rebuilds
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    statement = orm_execute_state.statement
+    columns = MATCHED_COLUMNS.get(statement.table.name)
+    if columns is None:
+        return
+    if orm_execute_state.is_update:
+        parameters = orm_execute_state.parameters or {}
+        rows = parameters if isinstance(parameters, list) else [parameters]
+        written = set(statement.compile().params).union(*(row.keys() for row in rows))
+        if not columns & written:
+            return
+    touch(orm_execute_state.session, MATCHED_VERSIONS[statement.table.name])
+    orm_execute_state.session.info["matching_unindexed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    changes = session.info.pop("matching_changes", [])
+    bumped = session.info.get("bumped_versions", {})
+    if session.info.pop("matching_unindexed", False):
+        bumped = {}
+    bumped = {collection: bumped[collection] for collection in MATCHED_VERSIONS.values() if collection in bumped}
+    if changes or bumped:
+        matching_engine.apply(changes, bumped)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("matching_changes", None)
+    session.info.pop("matching_unindexed", None)
@@ -0,0 +1,336 @@
+import re
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text, func, inspect, select, text,
+)
+from sqlalchemy.engine import Connection, Engine
+from app.core.search import create_search_index
+
+# Versioned, in-place schema migrations.
+#
+# Each migration runs once, in order, inside its own transaction, and is
+# recorded in schema_migrations. Migrations only add things and check for
+# existing objects first, so they are safe on databases created by an older
+# create_all as well as on fresh ones.
+
+# Kept out of Base.metadata so create_all/drop_all never touch it
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+def _add_missing_columns(connection: Connection, table: Table, names: List[str]):
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    for name in names:
+        if name in existing:
+            continue
+        column_type = table.c[name].type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+
+def _create_indexes(connection: Connection, indexes):
+    for index in indexes:
+        index.create(connection, checkfirst=True)
+
+# The schema as it stood before migrations, frozen here so that later model
+# changes only ever reach a database through their own migration
+baseline_metadata = MetaData()
+Table(
+    "users", baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String, unique=True, index=True),
+    Column("email", String, unique=True, index=True),
+    Column("hashed_password", String),
+    Column("role", String, nullable=False),
+    Column("is_active", Boolean),
+    Column("is_approved", Boolean),
+    Column("created_at", DateTime),
+)
+Table(
+    "jobs", baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String, nullable=False),
+    Column("department", String, nullable=False),
+    Column("description", Text, nullable=False),
+    Column("required_skills", Text, nullable=False),
+    Column("employment_type", String, nullable=False),
+)
+Table(
+    "candidates", baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False),
+    Column("cv_text", Text, nullable=False),
+    Column("status", String, nullable=False),
+    Column("job_id", Integer, ForeignKey("jobs.id")),
+)
+Table(
+    "interviews", baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("candidate_id", Integer, ForeignKey("candidates.id")),
+    Column("job_id", Integer, ForeignKey("jobs.id"), nullable=True),
+    Column("interviewer_name", String, nullable=False),
+    Column("interviewer_user_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("scheduled_date", DateTime, nullable=False),
+    Column("duration_minutes", Integer),
+    Column("completed", Boolean),
+)
+Table(
+    "feedback", baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("interview_id", Integer, ForeignKey("interviews.id"), unique=True),
+    Column("comments", Text, nullable=False),
+    Column("rating", Integer, nullable=False),
+    Column("strengths", Text, nullable=True),
+    Column("weaknesses", Text, nullable=True),
+    Column("recommendation", String, nullable=True),
+    Column("created_at", DateTime),
+)
+Table(
+    "notifications", baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("candidate_id", Integer, ForeignKey("candidates.id")),
+    Column("message", Text, nullable=False),
+    Column("type", String, nullable=False),
+    Column("is_read", Boolean),
+    Column("created_at", DateTime),
+)
+Table(
+    "notifications_archive", baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("candidate_id", Integer, nullable=True),
+    Column("message", Text, nullable=False),
+    Column("type", String, nullable=False),
+    Column("created_at", DateTime, nullable=True),
+    Column("archived_at", DateTime),
+    Index("ix_notifications_archive_candidate_created", "candidate_id", "created_at"),
+)
+
+# What later migrations add, frozen as each one shipped. Tables that are
+# only altered or indexed carry just the columns the migrations name.
+_released = MetaData()
+_released_candidates = Table(
+    "candidates", _released,
+    Column("id", Integer),
+    Column("job_id", Integer),
+    Column("status", String),
+    Column("cv_sha256", String(64)),
+    Column("cv_filename", String),
+    Column("cv_content_type", String),
+    Column("cv_size", Integer),
+    Column("cv_extraction_status", String),
+    Column("cv_extraction_error", Text),
+)
+_released_interviews = Table(
+    "interviews", _released,
+    Column("candidate_id", Integer),
+    Column("interviewer_user_id", Integer),
+    Column("scheduled_date", DateTime),
+    Column("duration_minutes", Integer),
+)
+_released_notifications = Table(
+    "notifications", _released,
+    Column("candidate_id", Integer),
+    Column("is_read", Boolean),
+    Column("created_at", DateTime),
+)
+_released_entity_versions = Table(
+    "entity_versions", _released,
+    Column("collection", String, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+_released_status_transitions = Table(
+    "status_transitions", _released,
+    Column("id", Integer, primary_key=True),
+    Column("candidate_id", Integer, nullable=False),
+    Column("job_id", Integer, nullable=True),
+    Column("from_status", String, nullable=True),
+    Column("to_status", String, nullable=False),
+    Column("changed_at", DateTime, nullable=False),
+    Column("changed_by_user_id", Integer, nullable=True),
+    Index("ix_status_transitions_candidate_changed", "candidate_id", "changed_at"),
+    Index("ix_status_transitions_job_changed", "job_id", "changed_at"),
+)
+_released_pipeline_counters = Table(
+    "pipeline_counters", _released,
+    Column("job_id", Integer, primary_key=True),
+    Column("status", String, primary_key=True),
+    Column("count", Integer, nullable=False),
+)
+
+CV_SHA256_INDEX = Index("ix_candidates_cv_sha256", _released_candidates.c.cv_sha256)
+# Created by migration 4 as the models declared them then; migration 6
+# replaces the interview ones with the composite scheduling indexes and
+# migration 11 the candidate ones with the Kanban keyset indexes
+RELEASED_CANDIDATE_INDEXES = (
+    Index("ix_candidates_status", _released_candidates.c.status),
+    Index("ix_candidates_job_status", _released_candidates.c.job_id, _released_candidates.c.status),
+)
+RELEASED_INTERVIEW_INDEXES = (
+    Index("ix_interviews_candidate_id", _released_interviews.c.candidate_id),
+    Index("ix_interviews_interviewer_user_id", _released_interviews.c.interviewer_user_id),
+)
+NOTIFICATION_INDEX = Index(
+    "ix_notifications_candidate_read_created",
+    _released_notifications.c.candidate_id, _released_notifications.c.is_read, _released_notifications.c.created_at,
+)
+INTERVIEW_SCHEDULE_INDEXES = (
+    Index("ix_interviews_interviewer_schedule", _released_interviews.c.interviewer_user_id, _released_interviews.c.scheduled_date),
+    Index("ix_interviews_candidate_schedule", _released_interviews.c.candidate_id, _released_interviews.c.scheduled_date),
+)
+INTERVIEW_DURATION_INDEX = Index("ix_interviews_duration", _released_interviews.c.duration_minutes)
+# Keyset pages of a Kanban column are ordered by id within the status
+KANBAN_INDEXES = (
+    Index("ix_candidates_status_id", _released_candidates.c.status, _released_candidates.c.id),
+    Index("ix_candidates_job_status_id", _released_candidates.c.job_id, _released_candidates.c.status, _released_candidates.c.id),
+)
+
+def _initial_schema(connection: Connection):
+    # Creates only tables that don't exist yet
+    baseline_metadata.create_all(connection)
+
+def _cv_storage_columns(connection: Connection):
+    _add_missing_columns(connection, _released_candidates, [
+        "cv_sha256", "cv_filename", "cv_content_type", "cv_size",
+        "cv_extraction_status", "cv_extraction_error",
+    ])
+    _create_indexes(connection, [CV_SHA256_INDEX])
+
+def _search_indexes(connection: Connection):
+    for table in ("candidates", "jobs"):
+        create_search_index(connection, table)
+
+def _hot_path_indexes(connection: Connection):
+    # candidates.job_id and notifications.candidate_id are the leading
+    # columns of the composite indexes, so they need no index of their own
+    _create_indexes(connection, [*RELEASED_CANDIDATE_INDEXES, *RELEASED_INTERVIEW_INDEXES, NOTIFICATION_INDEX])
+
+def _entity_versions(connection: Connection):
+    _released_entity_versions.create(connection, checkfirst=True)
+    existing = set(connection.scalars(select(_released_entity_versions.c.collection)))
+    for table in ("jobs", "candidates"):
+        if table not in existing:
+            connection.execute(_released_entity_versions.insert().values(collection=table, version=0))
+
+def _interview_schedule_indexes(connection: Connection):
+    _create_indexes(connection, INTERVIEW_SCHEDULE_INDEXES)
+    # The composite indexes lead with the same columns
+    for index in RELEASED_INTERVIEW_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+STATUS_CHANGE_MESSAGE = re.compile(r"^Candidate status changed from (?P<from_status>.+) to (?P<to_status>.+)$")
+
+def _status_transitions(connection: Connection):
+    table = _released_status_transitions
+    table.create(connection, checkfirst=True)
+    if connection.scalar(select(func.count()).select_from(table)):
+        return
+
+    # Rebuild what history there is from status-change notifications
+    # (including archived ones); candidates without any start at their
+    # current status as of now.
+    candidates_table = baseline_metadata.tables["candidates"]
+    candidates = {candidate_id: (job_id, status) for candidate_id, job_id, status in connection.execute(
+        select(candidates_table.c.id, candidates_table.c.job_id, candidates_table.c.status)
+    )}
+    rows, seen = [], set()
+    for source in (baseline_metadata.tables["notifications_archive"], baseline_metadata.tables["notifications"]):
+        messages = connection.execute(
+            select(source.c.candidate_id, source.c.message, source.c.created_at)
+            .where(source.c.type == "status_change", source.c.candidate_id.is_not(None))
+        )
+        for candidate_id, message, created_at in messages:
+            match = STATUS_CHANGE_MESSAGE.match(message)
+            if match is None or created_at is None:
+                continue
+            seen.add(candidate_id)
+            rows.append({
+                "candidate_id": candidate_id,
+                "job_id": candidates.get(candidate_id, (None, None))[0],
+                "from_status": match["from_status"],
+                "to_status": match["to_status"],
+                "changed_at": created_at,
+            })
+    now = datetime.utcnow()
+    for candidate_id, (job_id, status) in candidates.items():
+        if candidate_id not in seen:
+            rows.append({"candidate_id": candidate_id, "job_id": job_id, "from_status": None, "to_status": status, "changed_at": now})
+    for start in range(0, len(rows), 1000):
+        connection.execute(table.insert(), rows[start:start + 1000])
+
+def _pipeline_counters(connection: Connection):
+    # What rebuild_counters did when this shipped
+    counters, candidates = _released_pipeline_counters, baseline_metadata.tables["candidates"]
+    counters.create(connection, checkfirst=True)
+    connection.execute(counters.delete())
+    connection.execute(counters.insert().from_select(
+        ["job_id", "status", "count"],
+        select(candidates.c.job_id, candidates.c.status, func.count(candidates.c.id))
+        .where(candidates.c.job_id.is_not(None))
+        .group_by(candidates.c.job_id, candidates.c.status),
+    ))
+
+def _interview_duration_index(connection: Connection):
+    _create_indexes(connection, [INTERVIEW_DURATION_INDEX])
+
+def _matching_versions(connection: Connection):
+    # Seeded so that concurrent first bumps update a row rather than race to insert it
+    existing = set(connection.scalars(select(_released_entity_versions.c.collection)))
+    for collection in ("candidates.matched", "jobs.matched"):
+        if collection not in existing:
+            connection.execute(_released_entity_versions.insert().values(collection=collection, version=0))
+
+def _kanban_keyset_indexes(connection: Connection):
+    _create_indexes(connection, KANBAN_INDEXES)
+    # Same leading columns; the new ones also cover the id ordering
+    for index in RELEASED_CANDIDATE_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+MIGRATIONS = [
+    Migration(1, "initial schema", _initial_schema),
+    Migration(2, "candidate CV storage and extraction columns", _cv_storage_columns),
+    Migration(3, "full-text search indexes", _search_indexes),
+    Migration(4, "hot-path foreign key and status indexes", _hot_path_indexes),
+    Migration(5, "entity version counters for ETags", _entity_versions),
+    Migration(6, "interviewer and candidate schedule indexes", _interview_schedule_indexes),
+    Migration(7, "candidate status transition log", _status_transitions),
+    Migration(8, "per-job pipeline counters", _pipeline_counters),
+    Migration(9, "interview duration index", _interview_duration_index),
+    Migration(10, "matched-column version counters", _matching_versions),
+    Migration(11, "Kanban keyset indexes ending in id", _kanban_keyset_indexes),
+]
+
+def applied_versions(engine: Engine) -> List[int]:
+    with engine.begin() as connection:
+        migration_metadata.create_all(connection)
+        return list(connection.scalars(select(schema_migrations.c.version).order_by(schema_migrations.c.version)))
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    applied = set(applied_versions(engine))
+    return [migration for migration in MIGRATIONS if migration.version not in applied]
+
+def upgrade(engine: Engine, target: int = None, log: Callable[[str], None] = print) -> List[Migration]:
+    """Apply pending migrations up to `target` (default: latest)."""
+    done = []
+    for migration in pending_migrations(engine):
+        if target is not None and migration.version > target:
+            break
+        log(f"Applying {migration.version:04d}: {migration.description}")
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.utcnow(),
+            ))
+        done.append(migration)
+    return done
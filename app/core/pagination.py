@@ -0,0 +1,109 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+# Opaque cursors for keyset pagination. A cursor holds the sort-key values of
+# the last row of a page, so the next page is a range scan on an index instead
+# of an OFFSET that gets slower the deeper the client pages.
+
+# List endpoints keep returning plain arrays; the cursor for the next page
+# travels in this header and is absent on the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort keys")
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _after(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+    # Row-value comparison (a, b) > (x, y) spelled out as
+    # a > x OR (a = x AND b > y) so it works on every backend
+    clauses = []
+    for i, column in enumerate(columns):
+        edge = column < values[i] if descending else column > values[i]
+        equal = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*equal, edge))
+    return or_(*clauses)
+
+def apply_keyset(query, columns: Sequence[Any], cursor: Optional[str] = None, limit: int = 100, descending: bool = False):
+    """Order a query by `columns` and start it after `cursor`.
+
+    One extra row is fetched so `split_page` can tell whether another page exists.
+    """
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns), descending))
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+def split_page(rows: Sequence[Any], columns: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the following page."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+def _page_query(query, columns, cursor, limit, skip, descending):
+    if skip:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+        order = [column.desc() if descending else column.asc() for column in columns]
+        return query.order_by(*order).offset(skip).limit(limit), False
+    return apply_keyset(query, columns, cursor, limit, descending), True
+
+def _finish_page(rows, columns, response, limit, keyset):
+    if not keyset:
+        return list(rows)
+    rows, next_cursor = split_page(rows, columns, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
+def paginate(
+    query,
+    columns: Sequence[Any],
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+    descending: bool = False,
+) -> List[Any]:
+    """Fetch one page of a list query.
+
+    Keyset mode is the default; a non-zero `skip` falls back to OFFSET paging
+    for existing clients.
+    """
+    query, keyset = _page_query(query, columns, cursor, limit, skip, descending)
+    return _finish_page(query.all(), columns, response, limit, keyset)
+
+async def paginate_async(
+    db,
+    statement,
+    columns: Sequence[Any],
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+    descending: bool = False,
+) -> List[Any]:
+    """`paginate` for a select() statement run on an AsyncSession."""
+    statement, keyset = _page_query(statement, columns, cursor, limit, skip, descending)
+    rows = (await db.execute(statement)).scalars().all()
+    return _finish_page(rows, columns, response, limit, keyset)
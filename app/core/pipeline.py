@@ -0,0 +1,117 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.base import Candidate, PipelineCounter, StatusTransition
+
+# Candidate pipeline bookkeeping. Every place that creates, deletes or
+# changes the status of a candidate records it here, in the caller's
+# transaction, so the transition log and the per-job counters commit or roll
+# back together with the candidate row itself.
+#
+# The deltas are computed from the candidate's current status, so callers
+# must read it with the row locked (`with_for_update()`); otherwise two concurrent moves of one candidate both
+# subtract from the old status and the counters drift.
+
+def transition(
+    candidate_id: int,
+    job_id: Optional[int],
+    from_status: Optional[str],
+    to_status: str,
+    changed_by_user_id: Optional[int] = None,
+    changed_at: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    return {
+        "candidate_id": candidate_id,
+        "job_id": job_id,
+        "from_status": from_status,
+        "to_status": to_status,
+        "changed_at": changed_at or datetime.utcnow(),
+        "changed_by_user_id": changed_by_user_id,
+    }
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
+
+def adjust_counters(db: Session, deltas: Dict[Tuple[Optional[int], str], int]):
+    """Add to the (job_id, status) counters; candidates without a job aren't counted."""
+    # Sorted keys keep concurrent writers locking rows in the same order
+    rows = [
+        {"job_id": job_id, "status": status, "count": delta}
+        for (job_id, status), delta in sorted(deltas.items(), key=lambda item: (item[0][0] or 0, item[0][1]))
+        if job_id is not None and delta
+    ]
+    if not rows:
+        return
+    dialect = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect is None:
+        # No upsert: update the counter, insert it if it doesn't exist yet
+        for row in rows:
+            bumped = db.execute(
+                update(PipelineCounter)
+                .where(PipelineCounter.job_id == row["job_id"], PipelineCounter.status == row["status"])
+                .values(count=PipelineCounter.count + row["count"])
+            )
+            if not bumped.rowcount:
+                db.execute(insert(PipelineCounter).values(**row))
+        return
+    statement = dialect.insert(PipelineCounter)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[PipelineCounter.job_id, PipelineCounter.status],
+            set_={"count": PipelineCounter.count + statement.excluded.count},
+        ),
+        rows,
+    )
+
+def record_transitions(db: Session, transitions: List[Dict[str, Any]]):
+    """Log status changes built with `transition` and move the counters; unchanged statuses are skipped."""
+    rows = [row for row in transitions if row["from_status"] != row["to_status"]]
+    if not rows:
+        return
+    db.execute(insert(StatusTransition), rows)
+    deltas: Counter = Counter()
+    for row in rows:
+        if row["from_status"] is not None:
+            deltas[(row["job_id"], row["from_status"])] -= 1
+        deltas[(row["job_id"], row["to_status"])] += 1
+    adjust_counters(db, deltas)
+
+def record_transition(db: Session, candidate_id: int, job_id: Optional[int], from_status: Optional[str], to_status: str,
+                      changed_by_user_id: Optional[int] = None):
+    record_transitions(db, [transition(candidate_id, job_id, from_status, to_status, changed_by_user_id)])
+
+def record_removal(db: Session, job_id: Optional[int], status: str):
+    """A candidate left the pipeline without a status change (deleted)."""
+    adjust_counters(db, {(job_id, status): -1})
+
+def record_job_change(db: Session, old_job_id: Optional[int], new_job_id: Optional[int], status: str):
+    """A candidate moved to another job, keeping its status."""
+    if old_job_id != new_job_id:
+        adjust_counters(db, {(old_job_id, status): -1, (new_job_id, status): 1})
+
+def remove_job_counters(db: Session, job_id: int):
+    """A job was deleted; its candidates no longer belong to any job."""
+    db.execute(delete(PipelineCounter).where(PipelineCounter.job_id == job_id))
+
+def job_counts(db: Session, job_id: int) -> Dict[str, int]:
+    """Candidates per status for one job; a primary-key lookup of at most one row per status."""
+    return dict(db.execute(
+        select(PipelineCounter.status, PipelineCounter.count).where(PipelineCounter.job_id == job_id)
+    ).all())
+
+def rebuild_counters(db: Session) -> int:
+    """Recompute every counter from the candidates table; returns the number of counter rows."""
+    if db.get_bind().dialect.name == "postgresql":
+        # Waits for in-flight counter updates and holds new ones until commit
+        db.execute(text("LOCK TABLE pipeline_counters IN EXCLUSIVE MODE"))
+    db.execute(delete(PipelineCounter))
+    db.execute(insert(PipelineCounter).from_select(
+        ["job_id", "status", "count"],
+        select(Candidate.job_id, Candidate.status, func.count(Candidate.id))
+        .where(Candidate.job_id.is_not(None))
+        .group_by(Candidate.job_id, Candidate.status),
+    ))
+    return db.scalar(select(func.count()).select_from(PipelineCounter))
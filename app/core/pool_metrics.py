@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+# Connection-pool statistics. Checkouts, new connections and invalidations
+# come from the pool events; the time spent waiting for a connection is
+# measured by a QueuePool subclass, since SQLAlchemy has no event that fires
+# before a checkout starts waiting.
+
+_registry: List["PoolMetrics"] = []
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        _registry.append(self)
+
+    def attach(self, pool: Pool):
+        self.pool = pool
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        if pool is None:
+            return {"initialized": False}
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            stats = {
+                "initialized": True,
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "total": round(self.wait_total * 1000, 3),
+                    "avg": round(self.wait_total * 1000 / waits, 3) if waits else 0.0,
+                    "max": round(self.wait_max * 1000, 3),
+                },
+            }
+        # Gauges are only available on queue pools
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            gauge = getattr(pool, name, None)
+            if gauge is not None:
+                stats[{"checkedout": "checked_out", "checkedin": "checked_in"}.get(name, name)] = gauge()
+        return stats
+
+def instrumented_pool(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Subclass of a queue pool that times every wait for a connection.
+
+    Pool.recreate() (after dispose) instantiates self.__class__, so the
+    metrics stay attached to the replacement pool.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+sync_pool_metrics = PoolMetrics("primary")
+async_pool_metrics = PoolMetrics("primary_async")
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    return {metrics.name: metrics.snapshot() for metrics in _registry}
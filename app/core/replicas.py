@@ -0,0 +1,104 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.database import (
+    DATABASE_REPLICA_URLS, AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal,
+)
+
+# Read-replica routing with read-your-writes.
+#
+# Read-only routes take their session from get_async_read_db (get_read_db in
+# sync routes), which uses a replica unless the client wrote recently. A
+# request whose primary session commits a write gets a short-lived cookie, and
+# until it expires that client's reads go to the primary, so it never sees a
+# replica that hasn't caught up yet.
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+STICKY_COOKIE = "read_primary_until"
+
+# Per-request mutable state, shared with the threadpool copies of the context
+_request_state: ContextVar[Optional[dict]] = ContextVar("replica_request_state", default=None)
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    state = _request_state.get()
+    if state is not None and state["wrote"]:
+        return True
+    value = request.cookies.get(STICKY_COOKIE)
+    try:
+        return value is not None and float(value) > time.time()
+    except ValueError:
+        return False
+
+def get_read_db(request: Request):
+    """Session for read-only routes: a replica, or the primary after a recent write."""
+    if not DATABASE_REPLICA_URLS or reads_pinned_to_primary(request):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """AsyncSession for read-only routes, routed like get_read_db."""
+    if not DATABASE_REPLICA_URLS or reads_pinned_to_primary(request):
+        db = AsyncSessionLocal()
+    else:
+        db = AsyncReadSessionLocal()
+    async with db:
+        yield db
+
+class ReadYourWritesMiddleware:
+    """Sets the sticky cookie on responses to requests that committed a write."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DATABASE_REPLICA_URLS:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"wrote": False}
+        token = _request_state.set(state)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and state["wrote"]:
+                until = time.time() + READ_YOUR_WRITES_SECONDS
+                cookie = f"{STICKY_COOKIE}={until:.0f}; Max-Age={READ_YOUR_WRITES_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _request_state.reset(token)
+
+@event.listens_for(Session, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Attempted to write through a read-replica session")
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _remember_write(session):
+    if session.info.pop("wrote", False):
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import models
+from app.core.database import SessionLocal
+
+# Notification retention. Read notifications older than the retention window
+# are moved to notifications_archive (or deleted) in small batches, each in
+# its own transaction, so the hot table stays small without long locks.
+#
+# Every worker starts the retention loop. On PostgreSQL each batch takes a
+# transaction-level advisory lock and a worker that doesn't get it skips the
+# run, so only one process moves rows at a time; the archive copy also skips
+# ids that are already archived, so an overlapping run can't collide on them.
+RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+RETENTION_MODE = os.getenv("NOTIFICATION_RETENTION_MODE", "archive")  # archive or delete
+RETENTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "1000"))
+RETENTION_INTERVAL_SECONDS = int(os.getenv("NOTIFICATION_RETENTION_INTERVAL_SECONDS", "3600"))
+RETENTION_MODES = ("archive", "delete")
+RETENTION_LOCK_KEY = 7_210_015  # pg advisory lock id
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+INSERT_IGNORE = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def apply_retention(
+    db: Session,
+    days: int = RETENTION_DAYS,
+    mode: str = RETENTION_MODE,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> int:
+    """Archive or delete read notifications older than `days`; returns the number of rows moved."""
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"Invalid retention mode '{mode}'. Must be one of: {', '.join(RETENTION_MODES)}")
+
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    Notification = models.Notification
+    total = 0
+    dialect = db.get_bind().dialect.name
+    while True:
+        if dialect == "postgresql" and not db.scalar(select(func.pg_try_advisory_xact_lock(RETENTION_LOCK_KEY))):
+            # Another process is applying retention
+            db.rollback()
+            break
+        ids = db.scalars(
+            select(Notification.id)
+            .where(Notification.is_read == True, Notification.created_at < cutoff)
+            .order_by(Notification.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+
+        if mode == "archive":
+            Archive = models.NotificationArchive
+            columns = [Notification.id, Notification.candidate_id, Notification.message, Notification.type, Notification.created_at]
+            statement = INSERT_IGNORE.get(dialect, insert)(Archive).from_select(
+                ["id", "candidate_id", "message", "type", "created_at"],
+                select(*columns).where(
+                    Notification.id.in_(ids),
+                    ~exists().where(Archive.id == Notification.id),
+                )
+            )
+            if dialect in INSERT_IGNORE:
+                statement = statement.on_conflict_do_nothing(index_elements=[Archive.id])
+            db.execute(statement)
+        db.execute(delete(Notification).where(Notification.id.in_(ids)).execution_options(synchronize_session=False))
+        db.commit()
+        total += len(ids)
+    return total
+
+def run_retention() -> int:
+    db = SessionLocal()
+    try:
+        return apply_retention(db)
+    finally:
+        db.close()
+
+async def retention_loop():
+    """Background task started with the app; runs the blocking batches in the threadpool."""
+    while True:
+        try:
+            moved = await run_in_threadpool(run_retention)
+            if moved:
+                print(f"Notification retention: {RETENTION_MODE}d {moved} notifications")
+        except Exception as e:
+            print(f"Notification retention failed: {e}")
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    print(f"{RETENTION_MODE}d {run_retention()} notifications older than {RETENTION_DAYS} days")
@@ -0,0 +1,176 @@
+import os
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import Float, cast, func, or_, select
+from sqlalchemy.orm import Session
+from app.models.base import Interview
+
+# Interview overlap detection.
+#
+# Interviews are indexed on (interviewer_user_id, scheduled_date) and
+# (candidate_id, scheduled_date). Anything overlapping [start, end) must
+# start inside (start - longest interview, end), so each check is one index
+# seek plus a scan of that person's interviews in a window of a few hours,
+# however large the calendar grows. New interviews are capped at
+# MAX_INTERVIEW_MINUTES; ones stored before the cap may be longer, so the
+# window is widened to the longest stored duration (ix_interviews_duration
+# makes that a single index lookup).
+MAX_INTERVIEW_MINUTES = int(os.getenv("MAX_INTERVIEW_MINUTES", "480"))
+DEFAULT_INTERVIEW_MINUTES = 60
+
+def as_utc_naive(value: datetime) -> datetime:
+    # scheduled_date is stored without a time zone
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def interview_end(start: datetime, duration_minutes: Optional[int]) -> datetime:
+    return start + timedelta(minutes=duration_minutes or DEFAULT_INTERVIEW_MINUTES)
+
+def longest_interview_minutes(db: Session) -> int:
+    longest = db.scalar(select(func.max(Interview.duration_minutes)))
+    return max(MAX_INTERVIEW_MINUTES, longest or 0)
+
+def find_conflicts(
+    db: Session,
+    start: datetime,
+    duration_minutes: int,
+    interviewer_user_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    exclude_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Interviews of the interviewer or candidate overlapping the given slot, earliest first.
+
+    Back-to-back interviews (one ending exactly when the other starts) don't conflict.
+    """
+    start = as_utc_naive(start)
+    end = interview_end(start, duration_minutes)
+    earliest = start - timedelta(minutes=longest_interview_minutes(db))
+
+    conflicts = []
+    for party, column, value in (
+        ("interviewer", Interview.interviewer_user_id, interviewer_user_id),
+        ("candidate", Interview.candidate_id, candidate_id),
+    ):
+        if value is None:
+            continue
+        query = db.query(
+            Interview.id, Interview.candidate_id, Interview.interviewer_user_id,
+            Interview.scheduled_date, Interview.duration_minutes,
+        ).filter(
+            column == value,
+            Interview.scheduled_date > earliest,
+            Interview.scheduled_date < end,
+        )
+        if exclude_id is not None:
+            query = query.filter(Interview.id != exclude_id)
+        for row in query.order_by(Interview.scheduled_date):
+            row_end = interview_end(row.scheduled_date, row.duration_minutes)
+            if row_end > start:
+                conflicts.append({
+                    "interview_id": row.id,
+                    "party": party,
+                    "candidate_id": row.candidate_id,
+                    "interviewer_user_id": row.interviewer_user_id,
+                    "scheduled_date": row.scheduled_date,
+                    "ends_at": row_end,
+                })
+    return conflicts
+
+# Free-slot search. Busy intervals of everyone involved are fetched as epoch
+# seconds and merged with a vectorised sweep: sorted by start, an interval
+# opens a new busy block when it starts after the furthest end reached so
+# far. The gaps inside working hours that are long enough are the common
+# free slots.
+
+Interval = Tuple[datetime, datetime]
+EPOCH = datetime(1970, 1, 1)
+
+def epoch_seconds(column, dialect: str):
+    # Both read a naive timestamp as UTC
+    if dialect == "sqlite":
+        return cast(func.strftime("%s", column), Float)
+    return func.extract("epoch", column)
+
+def busy_intervals(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    interviewer_user_ids: Sequence[int] = (),
+    candidate_id: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end epoch seconds of the interviews of any of the interviewers or the candidate overlapping [start, end)."""
+    people = []
+    if interviewer_user_ids:
+        people.append(Interview.interviewer_user_id.in_(interviewer_user_ids))
+    if candidate_id is not None:
+        people.append(Interview.candidate_id == candidate_id)
+    if not people:
+        return np.empty(0), np.empty(0)
+    # Core execution on the session's connection: no ORM row processing
+    result = db.connection().execute(
+        select(
+            epoch_seconds(Interview.scheduled_date, db.get_bind().dialect.name),
+            func.coalesce(Interview.duration_minutes, DEFAULT_INTERVIEW_MINUTES),
+        ).where(
+            or_(*people),
+            Interview.scheduled_date > start - timedelta(minutes=longest_interview_minutes(db)),
+            Interview.scheduled_date < end,
+        )
+    )
+    columns = list(zip(*result.all()))
+    if not columns:
+        return np.empty(0), np.empty(0)
+    starts = np.array(columns[0], dtype=float)
+    ends = starts + np.array(columns[1], dtype=float) * 60
+    overlapping = ends > (start - EPOCH).total_seconds()
+    return starts[overlapping], ends[overlapping]
+
+def merge_intervals(starts: np.ndarray, ends: np.ndarray) -> List[Interval]:
+    """Union of intervals as sorted, non-overlapping, non-touching datetime intervals."""
+    if not len(starts):
+        return []
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    opens = np.empty(len(starts), dtype=bool)
+    opens[0] = True
+    opens[1:] = starts[1:] > reach[:-1]
+    closes = np.append(opens[1:], True)
+    return [
+        (EPOCH + timedelta(seconds=float(block_start)), EPOCH + timedelta(seconds=float(block_end)))
+        for block_start, block_end in zip(starts[opens], reach[closes])
+    ]
+
+def working_windows(start: datetime, end: datetime, day_start: time, day_end: time, weekdays_only: bool = True) -> List[Interval]:
+    """Working-hours windows of each day, clipped to [start, end)."""
+    windows = []
+    day = start.date()
+    while day <= end.date():
+        if not weekdays_only or day.weekday() < 5:
+            window_start = max(start, datetime.combine(day, day_start))
+            window_end = min(end, datetime.combine(day, day_end))
+            if window_start < window_end:
+                windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return windows
+
+def free_slots(busy: List[Interval], windows: List[Interval], min_duration: timedelta) -> List[Interval]:
+    """Gaps of at least `min_duration` in sorted `windows` not covered by merged `busy` intervals."""
+    slots = []
+    i = 0
+    for window_start, window_end in windows:
+        # Skip busy blocks that ended before this window
+        while i < len(busy) and busy[i][1] <= window_start:
+            i += 1
+        cursor = window_start
+        j = i
+        while j < len(busy) and busy[j][0] < window_end:
+            if busy[j][0] - cursor >= min_duration:
+                slots.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if window_end - cursor >= min_duration:
+            slots.append((cursor, window_end))
+    return slots
@@ -0,0 +1,155 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import DDL, and_, case, event, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.base import Candidate, JobPosting
+
+# Full-text search over candidates and jobs.
+#
+# PostgreSQL: a GIN expression index on to_tsvector(...) of the searchable
+# columns, queried with websearch_to_tsquery and ranked with ts_rank.
+# SQLite: an external-content FTS5 table per entity, kept in sync by
+# triggers and ranked with bm25.
+#
+# Both indexes are maintained by the database on every insert, update and
+# delete, whether the write comes from the ORM or a bulk statement.
+#
+# Other databases get a LIKE search instead: every term must appear in one of
+# the searchable columns, ranked by the weights of the columns it appears in.
+# It has no index to use and scans the table.
+
+SEARCH_CONFIG = "english"
+
+# table -> (searchable columns, relative weights for bm25)
+SEARCHABLE = {
+    Candidate.__tablename__: (("name", "email", "cv_text"), (10.0, 5.0, 1.0)),
+    JobPosting.__tablename__: (("title", "description", "required_skills"), (10.0, 1.0, 5.0)),
+}
+
+def _document(table: str) -> str:
+    columns, _ = SEARCHABLE[table]
+    return " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+
+def _tsvector(table: str) -> str:
+    # Must match the indexed expression exactly for the planner to use the GIN index
+    return f"to_tsvector('{SEARCH_CONFIG}', {_document(table)})"
+
+def _postgres_ddl(table: str) -> List[str]:
+    return [f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING GIN ({_tsvector(table)})"]
+
+def _sqlite_ddl(table: str) -> List[str]:
+    columns, _ = SEARCHABLE[table]
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        # Only re-index when a searchable column changes, not on every status move
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        # Index rows that existed before the FTS table was created
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+def create_search_index(connection, table: str):
+    """Create the full-text index for `table` on an existing database (idempotent)."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        statements = _postgres_ddl(table)
+    elif dialect == "sqlite":
+        statements = _sqlite_ddl(table)
+    else:
+        return
+    for statement in statements:
+        connection.execute(text(statement))
+
+for _model in (Candidate, JobPosting):
+    _table = _model.__tablename__
+    for _statement in _postgres_ddl(_table):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+    for _statement in _sqlite_ddl(_table):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(_model.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {_table}_fts").execute_if(dialect="sqlite"))
+
+SEARCH_MODELS = {model.__tablename__: model for model in (Candidate, JobPosting)}
+
+def like_search_query(table: str, query: str, limit: int, offset: int, filters: Dict[str, int]):
+    """(id, rank) query for the LIKE fallback, or None when `query` has no terms."""
+    terms = [term.lower() for term in re.findall(r"\w+", query)]
+    if not terms:
+        return None
+    model = SEARCH_MODELS[table]
+    columns, weights = SEARCHABLE[table]
+    hits = [
+        [(func.lower(getattr(model, column)).contains(term, autoescape=True), weight) for column, weight in zip(columns, weights)]
+        for term in terms
+    ]
+    rank = sum(case((hit, weight), else_=0.0) for term_hits in hits for hit, weight in term_hits).label("rank")
+    conditions = [or_(*(hit for hit, _ in term_hits)) for term_hits in hits]
+    conditions += [getattr(model, column) == value for column, value in filters.items()]
+    return (
+        select(model.id, rank).where(and_(*conditions))
+        .order_by(rank.desc(), model.id).limit(limit).offset(offset)
+    )
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so user input can't be parsed as FTS5 syntax; terms are ANDed
+    terms = re.findall(r"\w+", query)
+    return " ".join('"' + term + '"' for term in terms)
+
+async def search(
+    db: AsyncSession,
+    table: str,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    filters: Optional[Dict[str, int]] = None,
+) -> List[Tuple[int, float]]:
+    """Return (id, rank) pairs for the best matches in `table`, best first."""
+    filters = filters or {}
+    params = {"q": query, "limit": limit, "offset": offset}
+    conditions = []
+    for i, (column, value) in enumerate(filters.items()):
+        conditions.append(f"{table}.{column} = :f{i}")
+        params[f"f{i}"] = value
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        where = " AND ".join([f"{_tsvector(table)} @@ websearch_to_tsquery('{SEARCH_CONFIG}', :q)"] + conditions)
+        sql = (
+            f"SELECT {table}.id, ts_rank({_tsvector(table)}, websearch_to_tsquery('{SEARCH_CONFIG}', :q)) AS rank "
+            f"FROM {table} WHERE {where} ORDER BY rank DESC, {table}.id LIMIT :limit OFFSET :offset"
+        )
+    elif dialect == "sqlite":
+        params["q"] = _fts5_query(query)
+        if not params["q"]:
+            return []
+        fts = f"{table}_fts"
+        _, weights = SEARCHABLE[table]
+        where = " AND ".join([f"{fts} MATCH :q"] + conditions)
+        sql = (
+            f"SELECT {table}.id, -bm25({fts}, {', '.join(str(w) for w in weights)}) AS rank "
+            f"FROM {fts} JOIN {table} ON {table}.id = {fts}.rowid "
+            f"WHERE {where} ORDER BY rank DESC, {table}.id LIMIT :limit OFFSET :offset"
+        )
+    else:
+        statement = like_search_query(table, query, limit, offset, filters)
+        if statement is None:
+            return []
+        return [(row[0], float(row[1])) for row in await db.execute(statement)]
+
+    return [(row[0], float(row[1])) for row in await db.execute(text(sql), params)]
+
+async def load_ranked(db: AsyncSession, model, hits: Sequence[Tuple[int, float]], options=()) -> List[Tuple[object, float]]:
+    """Load the rows for search hits in one query, keeping rank order."""
+    if not hits:
+        return []
+    rows = (await db.scalars(select(model).options(*options).where(model.id.in_([id for id, _ in hits])))).all()
+    by_id = {row.id: row for row in rows}
+    return [(by_id[id], rank) for id, rank in hits if id in by_id]
@@ -0,0 +1,143 @@
+import codecs
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+# Content-addressed blob store for uploaded CVs. Files are streamed to disk in
+# fixed-size chunks while being hashed, then stored under their SHA-256, so
+# identical uploads share one file and memory use does not grow with file size.
+# The file itself only lives in the store; the candidate row keeps its hash and
+# at most MAX_CV_TEXT_CHARS of its text for search and matching.
+CV_STORAGE_DIR = os.getenv("CV_STORAGE_DIR", "storage/cv")
+MAX_CV_BYTES = int(os.getenv("MAX_CV_BYTES", str(10 * 1024 * 1024)))  # 10 MB
+MAX_CV_TEXT_CHARS = int(os.getenv("MAX_CV_TEXT_CHARS", "100000"))
+CHUNK_SIZE = 64 * 1024
+HEAD_BYTES = 8
+# Multipart framing and the form fields sent alongside the file
+MAX_UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+def cap_cv_text(text: str) -> str:
+    return text[:MAX_CV_TEXT_CHARS]
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    size: int
+    path: str
+    text: Optional[str]  # first MAX_CV_TEXT_CHARS of a UTF-8 upload, None for binary files
+    head: bytes  # first HEAD_BYTES bytes, for file type magic numbers
+
+class BlobStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, sha256: str) -> str:
+        # Fan out into two directory levels to keep directories small
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self.path_for(sha256))
+
+    async def save_upload(self, upload: UploadFile, max_bytes: int = MAX_CV_BYTES) -> StoredBlob:
+        """Stream an upload into the store, rejecting it once it exceeds `max_bytes`."""
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        # The whole file is decoded to tell text from binary, but only the
+        # first MAX_CV_TEXT_CHARS characters are kept
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        text_parts = []
+        text_length = 0
+        size = 0
+        head = b""
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = await upload.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes} byte limit")
+                    digest.update(chunk)
+                    if len(head) < HEAD_BYTES:
+                        head += chunk[:HEAD_BYTES - len(head)]
+                    if text_parts is not None:
+                        try:
+                            part = decoder.decode(chunk)
+                        except UnicodeDecodeError:
+                            text_parts = None
+                        else:
+                            if text_length < MAX_CV_TEXT_CHARS:
+                                text_parts.append(part[:MAX_CV_TEXT_CHARS - text_length])
+                                text_length += len(text_parts[-1])
+                    await run_in_threadpool(tmp.write, chunk)
+
+            if text_parts is not None:
+                try:
+                    text_parts.append(decoder.decode(b"", final=True)[:MAX_CV_TEXT_CHARS - text_length])
+                except UnicodeDecodeError:
+                    text_parts = None
+
+            sha256 = digest.hexdigest()
+            path = self.path_for(sha256)
+            if os.path.exists(path):
+                # Same content already stored
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        text = "".join(text_parts) if text_parts is not None else None
+        return StoredBlob(sha256=sha256, size=size, path=path, text=text, head=head)
+
+cv_store = BlobStore(CV_STORAGE_DIR)
+
+class UploadLimitMiddleware:
+    """Answers 413 for request bodies to `paths` larger than `max_bytes`, before the route parses them.
+
+    FastAPI spools the whole multipart body to disk before the route runs, so
+    the check in save_upload alone only fires after an oversized upload has
+    been received. A Content-Length over the limit is refused without reading
+    the body; otherwise the body is counted as it arrives, which also stops
+    chunked uploads and understated Content-Length headers.
+    """
+
+    def __init__(self, app, paths, max_bytes: int = MAX_CV_BYTES + MAX_UPLOAD_OVERHEAD_BYTES):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the {self.max_bytes} byte limit"
+        length = Headers(scope=scope).get("content-length", "")
+        if length.isdigit() and int(length) > self.max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside body parsing; FastAPI passes HTTPExceptions through
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
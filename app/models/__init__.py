@@ -1 +1 @@
-from .base import JobPosting , Candidate , Interview , Feedback , Notification , UserRole , User 
\ No newline at end of file
+from .base import JobPosting , Candidate , Interview , Feedback , Notification , UserRole , User , NotificationArchive , EntityVersion , StatusTransition , PipelineCounter , CANDIDATE_STATUSES
\ No newline at end of file
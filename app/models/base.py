@@ -1,5 +1,5 @@
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum, Index
 from app.core.database import Base
 from datetime import datetime
 import enum
@@ -17,6 +17,9 @@ class UserRole(str , enum.Enum):
     @property
     def name(self):
         return self.value
+
+# Kanban columns, in board order
+CANDIDATE_STATUSES = ["Applied", "Screening", "Interview Scheduled", "Offer Extended", "Rejected", "Hired"]
   
 # Add this new User class to your existing models file
 class User(Base):
@@ -51,20 +54,34 @@ class Candidate(Base):
     name = Column(String, nullable=False)
     email = Column(String, nullable=False)
     cv_text = Column(Text, nullable=False)
-    status = Column(String, nullable=False)  # Applied, Screening, etc.
-    job_id = Column(Integer, ForeignKey('jobs.id'))
+    status = Column(String, nullable=False)  # Applied, Screening, etc.; indexed by ix_candidates_status_id
+    job_id = Column(Integer, ForeignKey('jobs.id'))  # indexed by ix_candidates_job_status_id
+    # Uploaded CV file, stored in the blob store under its SHA-256
+    cv_sha256 = Column(String(64), nullable=True, index=True)
+    cv_filename = Column(String, nullable=True)
+    cv_content_type = Column(String, nullable=True)
+    cv_size = Column(Integer, nullable=True)
+    # Background text extraction for binary CVs: pending, processing, done, failed
+    cv_extraction_status = Column(String, nullable=True)
+    cv_extraction_error = Column(Text, nullable=True)
 
     job = relationship("JobPosting", back_populates="candidates")
     interviews = relationship("Interview", back_populates="candidate")
     notifications = relationship("Notification", back_populates="candidate")
 
+    __table_args__ = (
+        # Kanban columns, board-wide and per job, paged by id
+        Index("ix_candidates_status_id", "status", "id"),
+        Index("ix_candidates_job_status_id", "job_id", "status", "id"),
+    )
+
 class Interview(Base):
     __tablename__ = "interviews"
     id = Column(Integer, primary_key=True)
-    candidate_id = Column(Integer, ForeignKey('candidates.id'))
+    candidate_id = Column(Integer, ForeignKey('candidates.id'))  # indexed by ix_interviews_candidate_schedule
     job_id = Column(Integer, ForeignKey('jobs.id') , nullable=True)
     interviewer_name = Column(String, nullable=False)  # Keep this for backward compatibility
-    interviewer_user_id = Column(Integer, ForeignKey('users.id'), nullable=True)  # New field
+    interviewer_user_id = Column(Integer, ForeignKey('users.id'), nullable=True)  # New field, indexed by ix_interviews_interviewer_schedule
     scheduled_date = Column(DateTime, nullable=False)
     duration_minutes = Column(Integer, default=60)
     completed = Column(Boolean, default=False)
@@ -76,6 +93,14 @@ class Interview(Base):
     @property
     def interviewer(self):
         return self.interviewer_name
+
+    __table_args__ = (
+        # Per-person calendars: overlap checks seek to a bounded scheduled_date range
+        Index("ix_interviews_interviewer_schedule", "interviewer_user_id", "scheduled_date"),
+        Index("ix_interviews_candidate_schedule", "candidate_id", "scheduled_date"),
+        # Bounds the overlap search window, see app.core.scheduling
+        Index("ix_interviews_duration", "duration_minutes"),
+    )
 class Feedback(Base):
     __tablename__ = "feedback"
     id = Column(Integer, primary_key=True)
@@ -92,10 +117,60 @@ class Feedback(Base):
 class Notification(Base):
     __tablename__ = "notifications"
     id = Column(Integer, primary_key=True)
-    candidate_id = Column(Integer, ForeignKey('candidates.id'))
+    candidate_id = Column(Integer, ForeignKey('candidates.id'))  # indexed by ix_notifications_candidate_read_created
     message = Column(Text, nullable=False)
     type = Column(String, nullable=False)  # status_change, interview_scheduled, feedback_added
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    candidate = relationship("Candidate", back_populates="notifications")
\ No newline at end of file
+    candidate = relationship("Candidate", back_populates="notifications")
+
+    __table_args__ = (
+        # Serves per-candidate unread counts and newest-first listings
+        Index("ix_notifications_candidate_read_created", "candidate_id", "is_read", "created_at"),
+    )
+
+class NotificationArchive(Base):
+    # Read notifications past the retention window, moved out of the hot table
+    __tablename__ = "notifications_archive"
+    id = Column(Integer, primary_key=True)  # id of the original notification
+    candidate_id = Column(Integer, nullable=True)
+    message = Column(Text, nullable=False)
+    type = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_notifications_archive_candidate_created", "candidate_id", "created_at"),
+    )
+class EntityVersion(Base):
+    # Per-table change counters behind the ETags of read endpoints
+    __tablename__ = "entity_versions"
+    collection = Column(String, primary_key=True)  # table name
+    version = Column(Integer, nullable=False, default=0)
+
+class StatusTransition(Base):
+    # Append-only log of candidate status changes. No foreign keys, so the
+    # history survives deleted candidates and jobs.
+    __tablename__ = "status_transitions"
+    id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, nullable=False)
+    job_id = Column(Integer, nullable=True)  # the candidate's job at the time
+    from_status = Column(String, nullable=True)  # None when the candidate entered the pipeline
+    to_status = Column(String, nullable=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    changed_by_user_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        # Per-candidate ordering for time-in-stage windows, per-job funnels
+        Index("ix_status_transitions_candidate_changed", "candidate_id", "changed_at"),
+        Index("ix_status_transitions_job_changed", "job_id", "changed_at"),
+    )
+
+class PipelineCounter(Base):
+    # Candidates per job and status, kept in step with every status change
+    # by app.core.pipeline; `python rebuild_counters.py` recomputes it
+    __tablename__ = "pipeline_counters"
+    job_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,7 @@
-from .job import Job, JobCreate
-from .job import Candidate, CandidateCreate
-from .interview import Interview, InterviewCreate, Feedback, FeedbackCreate, InterviewWithFeedback
-from .notification import Notification, NotificationCreate
-from .auth import User, UserCreate, UserLogin, Token, TokenData
\ No newline at end of file
+from .job import Job, JobCreate, JobSummary, JobPartial, JobSearchResult, RankedJob, JobStats
+from .job import Candidate, CandidateCreate, CandidateSummary, CandidatePartial, CandidateExtraction, CandidateSearchResult, RankedCandidate, ImportReport
+from .kanban import KanbanBoard, KanbanColumn, KanbanColumnPage, KanbanMove, KanbanBatchMove, KanbanMoveResult
+from .interview import Interview, InterviewCreate, Feedback, FeedbackCreate, InterviewWithFeedback, InterviewDetail, InterviewConflict, InterviewConflictError, AvailabilitySlot, Availability
+from .notification import Notification, NotificationCreate, NotificationIds, UnreadCount, ArchivedNotification
+from .auth import User, UserCreate, UserLogin, Token, TokenData
+from .analytics import Funnel, FunnelStage
\ No newline at end of file
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class FunnelStage(BaseModel):
+    status: str
+    reached: int  # distinct candidates who were ever in this stage
+    current: int  # candidates in this stage now
+    conversion_rate: Optional[float] = None  # reached / reached of the previous stage; None off the main path
+    completed_stints: int  # stays in this stage that have ended
+    median_hours_in_stage: Optional[float] = None
+
+class Funnel(BaseModel):
+    job_id: Optional[int] = None
+    entered: int  # distinct candidates with any recorded status
+    stages: List[FunnelStage]
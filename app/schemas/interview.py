@@ -1,6 +1,8 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from .job import CandidateSummary, JobSummary
+from app.core.scheduling import MAX_INTERVIEW_MINUTES
 
 class InterviewBase(BaseModel):
     candidate_id: int
@@ -11,10 +13,39 @@ class InterviewBase(BaseModel):
     completed: bool = False
 
 class InterviewCreate(InterviewBase):
-    pass
+    # Capped so overlap checks can bound their search window
+    duration_minutes: int = Field(60, ge=1, le=MAX_INTERVIEW_MINUTES)
+    # Checked for conflicts only when given; otherwise the interview is
+    # linked to the user scheduling it
+    interviewer_user_id: Optional[int] = None
+
+class InterviewConflict(BaseModel):
+    interview_id: int
+    party: str  # interviewer or candidate
+    candidate_id: Optional[int] = None
+    interviewer_user_id: Optional[int] = None
+    scheduled_date: datetime
+    ends_at: datetime
+
+class InterviewConflictError(BaseModel):
+    # 409 detail when a new interview overlaps existing ones
+    message: str
+    conflicts: List[InterviewConflict]
+
+class AvailabilitySlot(BaseModel):
+    start: datetime
+    end: datetime
+
+class Availability(BaseModel):
+    interviewer_user_ids: List[int]
+    candidate_id: Optional[int] = None
+    duration_minutes: int
+    busy_intervals: int  # merged busy intervals within the range
+    slots: List[AvailabilitySlot]
 
 class Interview(InterviewBase):
     id: int
+    interviewer_user_id: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
 class FeedbackBase(BaseModel):
@@ -35,4 +66,10 @@ class Feedback(FeedbackBase):
 
 class InterviewWithFeedback(Interview):
     feedback: Optional[Feedback] = None
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class InterviewDetail(InterviewWithFeedback):
+    # candidate/job are only filled when requested with ?include=
+    candidate: Optional[CandidateSummary] = None
+    job: Optional[JobSummary] = None
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel , ConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 
 class JobBase(BaseModel):
     title: str
@@ -21,6 +21,41 @@ class CandidateCreate(CandidateBase):
 
 class Candidate(CandidateBase):
     id: int
+    cv_sha256: Optional[str] = None
+    cv_filename: Optional[str] = None
+    cv_content_type: Optional[str] = None
+    cv_size: Optional[int] = None
+    cv_extraction_status: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class CandidateExtraction(BaseModel):
+    id: int
+    cv_extraction_status: Optional[str] = None
+    cv_extraction_error: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class CandidateSummary(BaseModel):
+    # Card/list projection, without the cv_text blob
+    id: int
+    name: str
+    email: str
+    status: str
+    job_id: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class CandidatePartial(BaseModel):
+    # Sparse fieldset row; only the requested fields are serialized
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    cv_text: Optional[str] = None
+    status: Optional[str] = None
+    job_id: Optional[int] = None
+    cv_sha256: Optional[str] = None
+    cv_filename: Optional[str] = None
+    cv_content_type: Optional[str] = None
+    cv_size: Optional[int] = None
+    cv_extraction_status: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
     
 class JobCreate(JobBase):
@@ -29,4 +64,54 @@ class JobCreate(JobBase):
 class Job(JobBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
-   
\ No newline at end of file
+
+class JobStats(BaseModel):
+    job_id: int
+    total: int
+    counts: Dict[str, int]  # every status, zeros included
+
+class JobSummary(BaseModel):
+    # List projection, without the description/required_skills blobs
+    id: int
+    title: str
+    department: str
+    employment_type: str
+    model_config = ConfigDict(from_attributes=True)
+
+class JobPartial(BaseModel):
+    # Sparse fieldset row; only the requested fields are serialized
+    id: int
+    title: Optional[str] = None
+    department: Optional[str] = None
+    description: Optional[str] = None
+    required_skills: Optional[str] = None
+    employment_type: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+   
+class CandidateSearchResult(BaseModel):
+    rank: float
+    candidate: CandidateSummary
+
+class JobSearchResult(BaseModel):
+    rank: float
+    job: JobSummary
+
+class MatchScore(BaseModel):
+    score: float
+    similarity: float
+    skill_overlap: float
+
+class RankedCandidate(MatchScore):
+    candidate: CandidateSummary
+
+class RankedJob(MatchScore):
+    job: JobSummary
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from .job import CandidateSummary
+
+class KanbanColumnPage(BaseModel):
+    status: str
+    items: List[CandidateSummary]
+    next_cursor: Optional[str] = None
+
+class KanbanColumn(KanbanColumnPage):
+    count: int
+
+class KanbanBoard(BaseModel):
+    job_id: Optional[int] = None
+    columns: List[KanbanColumn]
+
+class KanbanMove(BaseModel):
+    candidate_id: int
+    new_status: str
+
+class KanbanBatchMove(BaseModel):
+    moves: List[KanbanMove] = Field(..., min_length=1, max_length=1000)
+
+class KanbanMoveResult(BaseModel):
+    candidate_id: int
+    ok: bool
+    old_status: Optional[str] = None
+    new_status: Optional[str] = None
+    error: Optional[str] = None
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from typing import List, Optional
 
 class NotificationBase(BaseModel):
     candidate_id: int
@@ -13,4 +14,20 @@ class Notification(NotificationBase):
     id: int
     is_read: bool
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ArchivedNotification(BaseModel):
+    id: int
+    candidate_id: Optional[int] = None
+    message: str
+    type: str
+    created_at: Optional[datetime] = None
+    archived_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+class NotificationIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class UnreadCount(BaseModel):
+    candidate_id: Optional[int] = None
+    unread: int
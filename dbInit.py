@@ -1,13 +1,14 @@
 # filepath: d:\Dev\Recruitment-Tracking\Backend\initialize_db.py
-from app.core.database import Base, engine
+from app.core.database import Base, get_engine
 from app.models.base import JobPosting, Candidate
+import app.core.search  # registers the full-text index DDL
 
 # Drop all tables
 print("Dropping all tables...")
-Base.metadata.drop_all(bind=engine)
+Base.metadata.drop_all(bind=get_engine())
 print("Tables dropped successfully!")
 
 # Create all tables
 print("Creating tables...")
-Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=get_engine())
 print("Tables created successfully!")
@@ -0,0 +1,26 @@
+import argparse
+import json
+from app.core.database import SessionLocal
+from app.core import bulk_import
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import candidates from a CSV or NDJSON file")
+    parser.add_argument("path", help="CSV (name,email,job_id[,status,cv_text]) or NDJSON file")
+    parser.add_argument("--format", choices=bulk_import.FORMATS, help="Detected from the file extension when omitted")
+    parser.add_argument("--batch-size", type=int, default=bulk_import.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or bulk_import.detect_format(args.path)
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            report = bulk_import.import_candidates(db, bulk_import.iter_records(f, fmt), args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Inserted {report['inserted']} candidates, {report['failed']} rows failed")
+    for error in report["errors"]:
+        print(json.dumps(error))
+
+if __name__ == "__main__":
+    main()
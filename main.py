@@ -1,11 +1,14 @@
-from fastapi import FastAPI, Depends
-from sqlalchemy.orm import Session
-from app.core.database import get_db, engine
-from app.api import jobs, candidates, interviews, notifications, kanban, auth
-from app.core.database import Base
-from sqlalchemy.exc import OperationalError
-from sqlalchemy.sql import text
+from fastapi import FastAPI
+from app.api import jobs, candidates, interviews, notifications, kanban, auth, analytics
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core import cv_extraction, retention
+from app.core.health import health_prober
+from app.core.pool_metrics import pool_stats
+from app.core import job_cache
+from app.core.replicas import ReadYourWritesMiddleware
+from app.core.storage import UploadLimitMiddleware
+import asyncio
 
 # Initialize database
 app = FastAPI()
@@ -17,10 +20,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Pins a client's reads to the primary for a few seconds after it writes
+app.add_middleware(ReadYourWritesMiddleware)
 
-Base.metadata.create_all(bind=engine)
+# Refuses oversized CV uploads before they are spooled to disk
+app.add_middleware(UploadLimitMiddleware, paths=["/api/v1/candidates/upload/"])
+
+# The schema is created and upgraded explicitly with `python migrate.py`
 
 # Include routers
 app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
@@ -29,26 +38,58 @@ app.include_router(interviews.router, prefix="/api/v1", tags=["interviews"])
 app.include_router(notifications.router, prefix="/api/v1", tags=["notifications"])
 app.include_router(kanban.router, prefix="/api/v1", tags=["kanban"])
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
+
+@app.on_event("startup")
+async def start_notification_retention():
+    # Set NOTIFICATION_RETENTION_INTERVAL_SECONDS=0 to run retention only from cron
+    if retention.RETENTION_INTERVAL_SECONDS > 0:
+        app.state.retention_task = asyncio.create_task(retention.retention_loop())
+
+@app.on_event("startup")
+async def start_health_prober():
+    # Set HEALTH_CHECK_INTERVAL_SECONDS=0 to probe on each /health call instead
+    if health_prober.interval > 0:
+        app.state.health_task = asyncio.create_task(health_prober.run())
 
 @app.on_event("startup")
-def check_database_connection():
-    print("Starting server...")
-    try:
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
-        print("Database connected successfully!")
-    except OperationalError as e:
-        print(f"Database connection failed: {e}")
+async def requeue_cv_extraction():
+    # Queued extractions don't survive a restart
+    app.state.extraction_task = asyncio.create_task(cv_extraction.requeue_unfinished())
+
+@app.on_event("shutdown")
+def shutdown_extraction_pool():
+    task = getattr(app.state, "extraction_task", None)
+    if task is not None:
+        task.cancel()
+    cv_extraction.shutdown_pool()
+
+@app.on_event("shutdown")
+def stop_notification_retention():
+    task = getattr(app.state, "retention_task", None)
+    if task is not None:
+        task.cancel()
+
+@app.on_event("shutdown")
+def stop_health_prober():
+    task = getattr(app.state, "health_task", None)
+    if task is not None:
+        task.cancel()
 
 @app.get("/health", tags=["health"])
 def health_check():
-    try:
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
-        return {"status": "Database connected"}
-    except OperationalError:
-        return {"status": "Database not connected"}
-    
+    """Last result of the background database probe; never waits on the database once probed."""
+    if health_prober.interval > 0:
+        cached = health_prober.latest()
+        if cached is not None:
+            return cached
+    return health_prober.probe()
+
+@app.get("/metrics", tags=["health"])
+def metrics():
+    """Connection pool and cache statistics alongside the cached health result."""
+    return {"health": health_prober.latest(), "pools": pool_stats(), "caches": {"jobs": job_cache.stats()}}
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Recruitment Tracking API"}
@@ -0,0 +1,22 @@
+import argparse
+from app.core.database import get_engine
+from app.core import migrations
+
+def main():
+    parser = argparse.ArgumentParser(description="Upgrade the database schema in place")
+    parser.add_argument("--status", action="store_true", help="List migrations and whether they have been applied")
+    parser.add_argument("--target", type=int, help="Stop after this migration version")
+    args = parser.parse_args()
+
+    if args.status:
+        applied = set(migrations.applied_versions(get_engine()))
+        for migration in migrations.MIGRATIONS:
+            state = "applied" if migration.version in applied else "pending"
+            print(f"{migration.version:04d}  {state:8}  {migration.description}")
+        return
+
+    done = migrations.upgrade(get_engine(), args.target)
+    print(f"Applied {len(done)} migration(s)" if done else "Database is up to date")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from app.core.database import SessionLocal
+from app.core.pipeline import rebuild_counters
+
+def main():
+    db = SessionLocal()
+    try:
+        rows = rebuild_counters(db)
+        db.commit()
+        print(f"Rebuilt {rows} pipeline counter(s) from the candidates table")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding pipeline counters: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
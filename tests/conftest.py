@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Engines are built lazily from the environment; point the app at a throwaway
+# SQLite file before anything imports app.core.database
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db"))
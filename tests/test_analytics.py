@@ -0,0 +1,20 @@
+from sqlalchemy import Float, String, create_engine, literal, select, union_all
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.api.analytics import median_stints_query, stage_medians
+
+def _stints():
+    rows = [("Applied", 3600.0), ("Applied", 7200.0), ("Applied", 36000.0), ("Screening", 600.0), ("Screening", None)]
+    return union_all(*(
+        select(literal(status, String).label("status"), literal(seconds, Float).label("seconds")) for status, seconds in rows
+    )).subquery("stints")
+
+def test_postgres_computes_the_median_in_the_database():
+    sql = str(median_stints_query(_stints()).compile(dialect=postgresql.dialect()))
+    assert "WITHIN GROUP (ORDER BY stints.seconds)" in sql and "percentile_cont(" in sql
+    assert "GROUP BY stints.status" in sql
+
+def test_sqlite_falls_back_to_numpy(tmp_path):
+    with Session(create_engine(f"sqlite:///{tmp_path / 'analytics.db'}")) as db:
+        assert stage_medians(db, _stints()) == {"Applied": (3, 7200.0), "Screening": (1, 600.0)}
@@ -0,0 +1,71 @@
+import inspect
+from datetime import datetime
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import main
+from app import schemas
+from app.api import candidates, interviews, jobs, kanban, notifications
+from app.core import database, etags, job_cache, migrations
+from app.core.auth import get_current_user
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    migrations.upgrade(engine, log=lambda message: None)
+    engine.dispose()
+    monkeypatch.setattr(database, "_async_engine", create_async_engine(database.to_async_url(url)))
+
+    def no_sync_engine():
+        raise AssertionError("async route opened a sync connection")
+
+    monkeypatch.setattr(database, "get_engine", no_sync_engine)
+    monkeypatch.setattr(job_cache, "_cache", False)
+    etags._versions.clear()
+    main.app.dependency_overrides[get_current_user] = lambda: schemas.User(
+        id=1, username="u", email="u@example.com", role="admin", is_active=True, is_approved=True,
+        created_at=datetime(2026, 1, 1),
+    )
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+    etags._versions.clear()
+
+def test_async_url_uses_aiosqlite():
+    assert database.to_async_url("sqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    assert database.to_async_url("postgresql+psycopg2://h/db") == "postgresql+asyncpg://h/db"
+
+@pytest.mark.parametrize("module", [jobs, candidates, kanban, interviews, notifications])
+def test_ported_routes_run_on_the_event_loop(module):
+    routes = [route for route in module.router.routes if isinstance(route, APIRoute)]
+    assert routes
+    assert [route.path for route in routes if not inspect.iscoroutinefunction(route.endpoint)] == []
+
+def test_writes_and_reads_on_aiosqlite(client):
+    job = client.post("/api/v1/jobs/", json={
+        "title": "Python dev", "department": "x", "description": "d", "required_skills": "python", "employment_type": "ft",
+    }).json()
+    candidate = client.post("/api/v1/candidates/", json={
+        "name": "a", "email": "a@example.com", "cv_text": "python", "status": "Applied", "job_id": job["id"],
+    }).json()
+
+    first = client.get(f"/api/v1/candidates/{candidate['id']}")
+    assert first.json()["status"] == "Applied"
+    assert client.get(f"/api/v1/candidates/{candidate['id']}", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    moved = client.put("/api/v1/kanban/move", params={"candidate_id": candidate["id"], "new_status": "Screening"})
+    assert moved.json() == {"id": candidate["id"], "old_status": "Applied", "new_status": "Screening"}
+
+    # The session hooks fire on AsyncSession commits: version bump, counters, notifications
+    second = client.get(f"/api/v1/candidates/{candidate['id']}", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()["status"] == "Screening"
+    stats = client.get(f"/api/v1/jobs/{job['id']}/stats").json()
+    assert stats["counts"]["Screening"] == 1 and stats["counts"]["Applied"] == 0
+    assert client.get("/api/v1/notifications/unread-count").json()["unread"] == 1
+    board = client.get("/api/v1/kanban/board").json()
+    assert [column["count"] for column in board["columns"] if column["status"] == "Screening"] == [1]
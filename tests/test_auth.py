@@ -0,0 +1,67 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import auth, migrations
+from app.core.auth import clear_principals, create_access_token, get_current_user
+from app.core.cache import SQLiteTTLCache
+from app.core.database import to_async_url
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    migrations.upgrade(engine, log=lambda message: None)
+    clear_principals()
+    with Session(engine) as session:
+        session.add(models.User(username="alice", email="alice@example.com", hashed_password="x", role="recruiter",
+                                is_active=True, is_approved=True))
+        session.commit()
+        yield session
+    clear_principals()
+
+def _authenticate(db, username):
+    async def authenticate():
+        engine = create_async_engine(to_async_url(db.get_bind().url.render_as_string()))
+        try:
+            async with AsyncSession(engine) as session:
+                return await get_current_user(create_access_token({"sub": username}, timedelta(minutes=5)), session)
+        finally:
+            await engine.dispose()
+    return asyncio.run(authenticate())
+
+def test_renaming_a_user_revokes_the_old_username(db):
+    assert _authenticate(db, "alice").username == "alice"
+    user = db.query(models.User).filter(models.User.username == "alice").one()
+    user.username = "alicia"
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        _authenticate(db, "alice")
+    assert error.value.status_code == 401
+    assert _authenticate(db, "alicia").username == "alicia"
+
+def test_deactivating_a_user_with_a_bulk_update_revokes_it(db):
+    assert _authenticate(db, "alice").is_active
+    db.execute(update(models.User).where(models.User.username == "alice").values(is_active=False))
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        _authenticate(db, "alice")
+    assert error.value.status_code == 400
+
+def test_shared_backend_revokes_in_every_worker(db, tmp_path, monkeypatch):
+    path = str(tmp_path / "principals.sqlite3")
+    monkeypatch.setattr(auth, "_principal_cache", SQLiteTTLCache(path))
+    other_worker = SQLiteTTLCache(path)
+    assert _authenticate(db, "alice").role == "recruiter"
+    assert other_worker.get("alice")["username"] == "alice"
+    # A cached principal round-trips through JSON
+    assert _authenticate(db, "alice").created_at is not None
+
+    db.query(models.User).filter(models.User.username == "alice").one().role = "interviewer"
+    db.commit()
+    assert other_worker.get("alice") is None
@@ -0,0 +1,41 @@
+import io
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import bulk_import, migrations
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    migrations.upgrade(engine, log=lambda message: None)
+    with Session(engine) as session:
+        session.add(models.JobPosting(id=1, title="t", description="d", department="x", required_skills="py", employment_type="ft"))
+        session.commit()
+        yield session
+
+def _import(db, data: bytes, fmt: str, batch_size: int = 1):
+    return bulk_import.import_candidates(db, bulk_import.iter_records(io.BytesIO(data), fmt), batch_size)
+
+def test_bad_ndjson_rows_are_reported_and_the_rest_imported(db):
+    data = (
+        b'{"name": 5, "email": "z@example.com", "job_id": 1}\n'
+        b'{"name": "a", "email": "a@example.com", "job_id": 1}\n'
+        b'{"name": "\xff", "email": "b@example.com", "job_id": 1}\n'
+        b'{"name": "c", "email": "c@example.com", "job_id": true}\n'
+        b'{"name": "d", "email": "d@example.com", "job_id": "1", "status": "Hired"}\n'
+    )
+    report = _import(db, data, "ndjson")
+    assert report["inserted"] == 2
+    assert [error["row"] for error in report["errors"]] == [1, 3, 4]
+    assert report["errors"][0]["error"] == "name must be a string"
+    assert db.scalar(select(func.count(models.Candidate.id))) == 2
+
+def test_undecodable_csv_line_fails_only_its_record(db):
+    data = b'\xef\xbb\xbfname,email,job_id,cv_text\na,a@example.com,1,x\nb,b@example.com,1,"two\nli\xffnes"\nc,c@example.com,1,y\n'
+    report = _import(db, data, "csv")
+    assert report["inserted"] == 2
+    assert [error["row"] for error in report["errors"]] == [3]
+    assert report["errors"][0]["error"].startswith("Not valid UTF-8")
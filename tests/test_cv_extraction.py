@@ -0,0 +1,72 @@
+import asyncio
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import cv_extraction, database, migrations
+from app.core.storage import BlobStore
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body><w:p><w:r><w:t>Python developer</w:t></w:r></w:p></w:body></w:document>"
+)
+
+def _docx() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML)
+    return buffer.getvalue()
+
+def test_ascii_pdf_is_extracted_not_kept_as_text(tmp_path):
+    store = BlobStore(str(tmp_path))
+    blob = asyncio.run(store.save_upload(UploadFile(io.BytesIO(b"%PDF-1.4\n1 0 obj << >> endobj\n%%EOF\n"), filename="cv")))
+    assert blob.text is not None  # decodes as UTF-8
+    assert blob.head == b"%PDF-1.4"
+    assert cv_extraction.is_document(blob.head, None, "cv")
+    assert cv_extraction.is_document(b"plain te", "application/pdf", "cv")
+    assert cv_extraction.is_document(b"PK\x03\x04", None, "cv.zip")
+    assert not cv_extraction.is_document(b"Jane Doe", "text/plain", "cv.txt")
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'extraction.db'}"
+    engine = create_engine(url)
+    migrations.upgrade(engine, log=lambda message: None)
+    monkeypatch.setattr(database, "_async_engine", create_async_engine(database.to_async_url(url)))
+    monkeypatch.setattr(cv_extraction, "cv_store", BlobStore(str(tmp_path / "cv")))
+    monkeypatch.setattr(cv_extraction, "get_pool", lambda: ThreadPoolExecutor(max_workers=1))
+    yield engine
+    engine.dispose()
+
+def test_unfinished_extractions_are_requeued(engine):
+    blob = asyncio.run(cv_extraction.cv_store.save_upload(UploadFile(io.BytesIO(_docx()), filename="cv.docx")))
+    with Session(engine) as db:
+        db.add(models.JobPosting(id=1, title="t", department="d", description="d", required_skills="s", employment_type="ft"))
+        db.add_all([
+            models.Candidate(id=candidate_id, name="a", email="a@example.com", cv_text="", status="Applied", job_id=1,
+                             cv_sha256=blob.sha256, cv_filename="cv.docx", cv_extraction_status=status)
+            for candidate_id, status in ((1, cv_extraction.PENDING), (2, cv_extraction.PROCESSING), (3, cv_extraction.FAILED))
+        ])
+        db.commit()
+
+    assert asyncio.run(cv_extraction.requeue_unfinished()) == 2
+    with Session(engine) as db:
+        rows = db.query(models.Candidate.id, models.Candidate.cv_extraction_status, models.Candidate.cv_text).order_by(models.Candidate.id).all()
+    assert rows == [(1, "done", "Python developer"), (2, "done", "Python developer"), (3, "failed", "")]
+
+def test_a_claimed_extraction_is_not_run_twice(engine):
+    with Session(engine) as db:
+        db.add(models.Candidate(id=1, name="a", email="a@example.com", cv_text="", status="Applied",
+                                cv_sha256="0" * 64, cv_extraction_status=cv_extraction.PROCESSING))
+        db.commit()
+    # Not pending any more: another run holds it
+    asyncio.run(cv_extraction.run_extraction(1, "missing", None, "cv.pdf"))
+    with Session(engine) as db:
+        assert db.get(models.Candidate, 1).cv_extraction_status == cv_extraction.PROCESSING
@@ -0,0 +1,72 @@
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+import main
+from app import models, schemas
+from app.core import database, etags, job_cache, migrations, replicas
+from app.core.auth import get_current_user
+from app.core.cache import TTLCache
+
+def _database(path, titles):
+    """A migrated SQLite database whose job 1 went through `titles`, one commit each; returns its async engine."""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    migrations.upgrade(engine, log=lambda message: None)
+    with Session(engine) as db:
+        job = models.JobPosting(title=titles[0], description="d", department="x", required_skills="py", employment_type="ft")
+        db.add(job)
+        db.commit()
+        for title in titles[1:]:
+            job.title = title
+            db.commit()
+    engine.dispose()
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+@pytest.fixture
+def lagging_replicas(tmp_path, monkeypatch):
+    # The primary and one replica have both commits, the other replica only the first
+    primary = _database(tmp_path / "primary.db", ["Old", "New"])
+    behind = _database(tmp_path / "behind.db", ["Old"])
+    current = _database(tmp_path / "current.db", ["Old", "New"])
+    monkeypatch.setattr(database, "_async_engine", primary)
+    monkeypatch.setattr(database, "_async_replica_engines", [behind, current])
+    monkeypatch.setattr(replicas, "DATABASE_REPLICA_URLS", ["behind", "current"])
+    monkeypatch.setattr(job_cache, "_cache", TTLCache(maxsize=16, ttl=300))
+    etags._versions.clear()
+    main.app.dependency_overrides[get_current_user] = lambda: schemas.User(
+        id=1, username="u", email="u@example.com", role="admin", is_active=True, is_approved=True,
+        created_at=datetime(2026, 1, 1),
+    )
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+    etags._versions.clear()
+
+VERSION_OF_TITLE = {"Old": 1, "New": 2}
+
+def _version(etag):
+    return int(etag.strip('"').split("-")[0].split(".")[1])
+
+@pytest.mark.parametrize("path", ["/api/v1/jobs/1", "/api/v1/jobs/"])
+def test_etag_matches_the_replica_that_served_the_body(lagging_replicas, path):
+    for _ in range(6):
+        response = lagging_replicas.get(path)
+        body = response.json()
+        title = body["title"] if isinstance(body, dict) else body[0]["title"]
+        assert _version(response.headers["etag"]) == VERSION_OF_TITLE[title]
+
+def test_stale_replica_body_is_not_cached_under_the_new_version(lagging_replicas):
+    for _ in range(6):
+        lagging_replicas.get("/api/v1/jobs/1")
+    # Alternating replicas filled one entry per version, each with its own body
+    titles = {_version(key): value["title"] for key, (_, value) in job_cache._cache._data.items()}
+    assert titles == {1: "Old", 2: "New"}
+
+def test_pinned_client_reads_versions_from_the_primary(lagging_replicas):
+    lagging_replicas.cookies.set(replicas.STICKY_COOKIE, "9999999999")
+    for _ in range(4):
+        response = lagging_replicas.get("/api/v1/jobs/1")
+        assert response.json()["title"] == "New"
+        assert _version(response.headers["etag"]) == 2
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.core import health
+from app.core.health import CONNECTED, NOT_CONNECTED, HealthProber
+
+class Silent(Exception):
+    def __str__(self):
+        return ""
+
+def _failing_engine():
+    raise Silent()
+
+def test_probe_reports_exceptions_without_a_message(monkeypatch):
+    monkeypatch.setattr(health, "get_engine", _failing_engine)
+    result = HealthProber(interval=1).probe()
+    assert result["status"] == NOT_CONNECTED
+    assert result["error"] == "Silent"
+
+def test_loop_survives_a_failing_probe(monkeypatch):
+    prober = HealthProber(interval=0.01)
+    calls = []
+
+    async def probe_async():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(prober, "probe_async", probe_async)
+
+    async def run_briefly():
+        task = asyncio.ensure_future(prober.run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+    assert len(calls) > 1
+    assert prober.latest()["status"] == NOT_CONNECTED
+
+def test_stale_result_is_reported_unhealthy(monkeypatch):
+    prober = HealthProber(interval=5)
+    prober._record(True, 0.001)
+    assert prober.latest()["status"] == CONNECTED
+    prober._checked_monotonic -= 5 * health.HEALTH_CHECK_STALE_INTERVALS + 1
+    assert prober.latest()["status"] == NOT_CONNECTED
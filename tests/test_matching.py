@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import database, etags, migrations
+from app.core.matching import MatchingEngine, matching_engine
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'matching.db'}")
+    migrations.upgrade(engine, log=lambda message: None)
+    etags._versions.clear()
+    with Session(engine) as session:
+        session.add(models.JobPosting(id=1, title="Python dev", description="d", department="x",
+                                      required_skills="python django", employment_type="ft"))
+        session.add(models.Candidate(id=1, name="a", email="a@example.com", job_id=1, cv_text="python django", status="Applied"))
+        session.commit()
+        yield session
+    matching_engine.invalidate()
+    etags._versions.clear()
+
+def _ranked(engine, db):
+    engine.load(db)
+    return [match["id"] for match in engine.rank_candidates("Python dev", "python django", 10)]
+
+def test_rebuilds_after_writes_from_another_process(db):
+    engine = MatchingEngine()
+    assert _ranked(engine, db) == [1]
+    # What another worker or the CLI would commit: rows plus a version bump
+    db.execute(text("INSERT INTO candidates (id, name, email, job_id, cv_text, status) "
+                    "VALUES (2, 'b', 'b@example.com', 1, 'python django django', 'Applied')"))
+    db.execute(text("UPDATE entity_versions SET version = version + 1 WHERE collection = 'candidates.matched'"))
+    db.commit()
+    etags._versions.clear()  # skip the in-process version TTL
+    assert _ranked(engine, db) == [1, 2]
+
+def test_own_commits_are_applied_without_a_rebuild(db):
+    assert _ranked(matching_engine, db) == [1]
+    matrix = matching_engine.candidates
+    db.add(models.Candidate(id=2, name="b", email="b@example.com", job_id=1, cv_text="python django django", status="Applied"))
+    db.commit()
+    assert _ranked(matching_engine, db) == [1, 2]
+    assert matching_engine.candidates is matrix
+
+def test_writes_to_other_columns_keep_the_index(db):
+    assert _ranked(matching_engine, db) == [1]
+    matrix = matching_engine.candidates
+    # A status move, an ORM bulk update of unmatched columns, and another
+    # process bumping the table-wide ETag counter
+    db.get(models.Candidate, 1).status = "Screening"
+    db.commit()
+    db.execute(update(models.Candidate).values(cv_extraction_status="done"))
+    db.execute(text("UPDATE entity_versions SET version = version + 1 WHERE collection = 'candidates'"))
+    db.commit()
+    etags._versions.clear()
+    assert _ranked(matching_engine, db) == [1]
+    assert matching_engine.candidates is matrix
+
+def test_commits_during_a_rebuild_are_replayed(db):
+    engine = MatchingEngine()
+    replay = engine._start_rebuild()
+    # Committed by this process after the rebuild read its rows
+    engine.apply([("candidates", 2, (1, "python django django"))], {})
+    index = type(engine._index)()
+    index.add_jobs([(1, "Python dev", "python django")])
+    index.add_candidates([(1, 1, "python django")])
+    engine._finish_rebuild(replay, index, {"candidates.matched": 0, "jobs.matched": 0})
+    assert [match["id"] for match in engine.rank_candidates("Python dev", "python django", 10)] == [1, 2]
+    assert engine._rebuilds == []
+
+def test_async_load_streams_rows(db):
+    engine = MatchingEngine()
+    async_engine = create_async_engine(database.to_async_url(db.get_bind().url.render_as_string()))
+
+    async def load():
+        async with AsyncSession(async_engine) as session:
+            await engine.load_async(session)
+        await async_engine.dispose()
+
+    asyncio.run(load())
+    # The fixture's inserts bumped both counters
+    assert engine.loaded and engine.versions == {"candidates.matched": 1, "jobs.matched": 1}
+    assert [match["id"] for match in engine.rank_candidates("Python dev", "python django", 10)] == [1]
@@ -0,0 +1,38 @@
+from sqlalchemy import create_engine, inspect
+
+from app.core import migrations
+from app.core.database import Base
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: ({column["name"] for column in inspector.get_columns(table)}, {index["name"] for index in inspector.get_indexes(table)})
+        for table in inspector.get_table_names()
+        # Full-text search and bookkeeping tables aren't models
+        if table in Base.metadata.tables
+    }
+
+def test_baseline_has_no_later_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    migrations.upgrade(engine, target=1, log=lambda message: None)
+    schema = _schema(engine)
+    assert "cv_sha256" not in schema["candidates"][0]
+    assert not {"entity_versions", "status_transitions", "pipeline_counters"} & set(schema)
+
+def test_fresh_database_matches_the_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    migrations.upgrade(engine, log=lambda message: None)
+    assert _schema(engine) == {
+        table.name: ({column.name for column in table.columns}, {index.name for index in table.indexes})
+        for table in Base.metadata.sorted_tables
+    }
+
+def test_kanban_indexes_replace_the_released_ones(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kanban.db'}")
+    migrations.upgrade(engine, target=10, log=lambda message: None)
+    assert {"ix_candidates_status", "ix_candidates_job_status"} <= _schema(engine)["candidates"][1]
+    migrations.upgrade(engine, log=lambda message: None)
+    indexes = {index["name"]: index["column_names"] for index in inspect(engine).get_indexes("candidates")}
+    assert indexes["ix_candidates_status_id"] == ["status", "id"]
+    assert indexes["ix_candidates_job_status_id"] == ["job_id", "status", "id"]
+    assert not {"ix_candidates_status", "ix_candidates_job_status"} & set(indexes)
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+import main
+from app import models, schemas
+from app.core import database, migrations, pipeline
+from app.core.auth import get_current_user, is_recruiter_or_admin
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pipeline.db'}", connect_args={"check_same_thread": False})
+    migrations.upgrade(engine, log=lambda message: None)
+    monkeypatch.setattr(database, "_async_engine", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pipeline.db'}"))
+    with Session(engine) as session:
+        session.add(models.JobPosting(id=1, title="t", description="d", department="x", required_skills="py", employment_type="ft"))
+        session.commit()
+        yield session
+
+def _counters(db):
+    return {(job_id, status): count for job_id, status, count in db.execute(
+        select(models.PipelineCounter.job_id, models.PipelineCounter.status, models.PipelineCounter.count)
+    )}
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_adjust_counters(db, monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(pipeline, "UPSERT_DIALECTS", {})
+    pipeline.adjust_counters(db, {(1, "Applied"): 2, (None, "Applied"): 1})
+    pipeline.adjust_counters(db, {(1, "Applied"): -1, (1, "Screening"): 1})
+    assert _counters(db) == {(1, "Applied"): 1, (1, "Screening"): 1}
+
+def test_deleting_a_job_drops_its_counters(db):
+    pipeline.record_transition(db, 1, 1, None, "Applied")
+    db.commit()
+    user = schemas.User(id=1, username="u", email="u@example.com", role="admin", is_active=True, is_approved=True,
+                        created_at=datetime(2026, 1, 1))
+    main.app.dependency_overrides[get_current_user] = lambda: user
+    main.app.dependency_overrides[is_recruiter_or_admin] = lambda: user
+    try:
+        assert TestClient(main.app).delete("/api/v1/jobs/1").status_code == 200
+    finally:
+        main.app.dependency_overrides.clear()
+    db.expire_all()
+    assert _counters(db) == {}
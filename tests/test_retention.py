@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import migrations
+from app.core.retention import apply_retention
+
+NOW = datetime(2026, 10, 1)
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    migrations.upgrade(engine, log=lambda message: None)
+    with Session(engine) as session:
+        yield session
+
+def test_rows_archived_by_an_overlapping_run_are_skipped(db):
+    old = NOW - timedelta(days=200)
+    for id in (1, 2, 3):
+        db.add(models.Notification(id=id, message=f"m{id}", type="status_change", is_read=True, created_at=old))
+    # Another worker already copied notification 2 but hasn't deleted it yet
+    db.add(models.NotificationArchive(id=2, message="m2", type="status_change", created_at=old))
+    db.commit()
+
+    assert apply_retention(db, days=90, mode="archive", batch_size=2, now=NOW) == 3
+    assert db.scalar(select(func.count()).select_from(models.Notification)) == 0
+    assert sorted(db.scalars(select(models.NotificationArchive.id))) == [1, 2, 3]
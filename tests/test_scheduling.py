@@ -0,0 +1,176 @@
+import time as clock
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+import main
+from app import models, schemas
+from app.core import database, etags, migrations
+from app.core.auth import get_current_user
+from app.core.scheduling import (
+    EPOCH, MAX_INTERVIEW_MINUTES, busy_intervals, find_conflicts, free_slots, merge_intervals, working_windows,
+)
+
+MONDAY = datetime(2026, 3, 2, 10)
+
+def _seconds(*moments):
+    return np.array([(moment - EPOCH).total_seconds() for moment in moments])
+
+def _at(day, hour, minute=0):
+    return datetime(2026, 3, day, hour, minute)
+
+def test_merge_joins_overlapping_and_touching_blocks():
+    starts = _seconds(_at(2, 11), _at(2, 9), _at(2, 10), _at(2, 13), _at(2, 9, 30))
+    ends = _seconds(_at(2, 12), _at(2, 10), _at(2, 10, 30), _at(2, 14), _at(2, 9, 45))
+    assert merge_intervals(starts, ends) == [(_at(2, 9), _at(2, 10, 30)), (_at(2, 11), _at(2, 12)), (_at(2, 13), _at(2, 14))]
+    assert merge_intervals(np.empty(0), np.empty(0)) == []
+
+def test_merge_keeps_a_long_block_open_over_shorter_ones():
+    starts = _seconds(_at(2, 9), _at(2, 10), _at(2, 15))
+    ends = _seconds(_at(2, 17), _at(2, 11), _at(2, 16))
+    assert merge_intervals(starts, ends) == [(_at(2, 9), _at(2, 17))]
+
+def test_working_windows_skip_weekends_and_clip_to_the_range():
+    # Thursday 12:00 to the next Tuesday 10:00
+    windows = working_windows(_at(5, 12), _at(10, 10), time(9), time(17))
+    assert windows == [(_at(5, 12), _at(5, 17)), (_at(6, 9), _at(6, 17)), (_at(9, 9), _at(9, 17)), (_at(10, 9), _at(10, 10))]
+    assert len(working_windows(_at(5, 12), _at(10, 10), time(9), time(17), weekdays_only=False)) == 6
+    # Starts after the working day, ends before the next one
+    assert working_windows(_at(2, 18), _at(3, 8), time(9), time(17)) == []
+
+def test_free_slots_around_busy_blocks():
+    windows = [(_at(2, 9), _at(2, 17)), (_at(3, 9), _at(3, 17)), (_at(4, 9), _at(4, 17))]
+    busy = [
+        (_at(2, 8), _at(2, 10)),  # started before the window
+        (_at(2, 11), _at(2, 11, 30)),  # leaves a 30 minute gap, too short
+        (_at(2, 12), _at(2, 16, 30)),
+        (_at(3, 16), _at(4, 10)),  # spans the night into the next window
+    ]
+    assert free_slots(busy, windows, timedelta(hours=1)) == [
+        (_at(2, 10), _at(2, 11)), (_at(3, 9), _at(3, 16)), (_at(4, 10), _at(4, 17)),
+    ]
+    assert free_slots(busy, windows, timedelta(minutes=30))[:3] == [
+        (_at(2, 10), _at(2, 11)), (_at(2, 11, 30), _at(2, 12)), (_at(2, 16, 30), _at(2, 17)),
+    ]
+    # A block covering several whole windows leaves nothing in them
+    assert free_slots([(_at(2, 0), _at(5, 0))], windows, timedelta(minutes=1)) == []
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scheduling.db'}")
+    migrations.upgrade(engine, log=lambda message: None)
+    with Session(engine) as db:
+        db.add_all([
+            models.User(id=1, username="recruiter", email="r@example.com", hashed_password="x", role="recruiter"),
+            models.User(id=2, username="interviewer", email="i@example.com", hashed_password="x", role="interviewer"),
+            models.JobPosting(id=1, title="t", department="d", description="d", required_skills="s", employment_type="ft"),
+        ])
+        db.add_all([
+            models.Candidate(id=number, name=f"c{number}", email=f"c{number}@example.com", cv_text="", status="Applied", job_id=1)
+            for number in (1, 2, 3)
+        ])
+        db.commit()
+    yield engine
+    engine.dispose()
+
+def _book(db, start, minutes, candidate_id=1, interviewer_user_id=2):
+    db.add(models.Interview(
+        candidate_id=candidate_id, job_id=1, interviewer_name="i", interviewer_user_id=interviewer_user_id,
+        scheduled_date=start, duration_minutes=minutes,
+    ))
+    db.commit()
+
+def test_back_to_back_interviews_do_not_conflict(engine):
+    with Session(engine) as db:
+        _book(db, MONDAY, 60)
+        assert find_conflicts(db, MONDAY + timedelta(hours=1), 60, interviewer_user_id=2) == []
+        assert find_conflicts(db, MONDAY - timedelta(hours=1), 60, interviewer_user_id=2) == []
+        overlapping = find_conflicts(db, MONDAY + timedelta(minutes=59), 60, interviewer_user_id=2, candidate_id=1)
+        assert [conflict["party"] for conflict in overlapping] == ["interviewer", "candidate"]
+
+def test_interview_starting_at_the_window_edge(engine):
+    # The longest allowed interview ends exactly at the new start, or one minute after it
+    with Session(engine) as db:
+        _book(db, MONDAY - timedelta(minutes=MAX_INTERVIEW_MINUTES), MAX_INTERVIEW_MINUTES)
+        assert find_conflicts(db, MONDAY, 30, interviewer_user_id=2) == []
+        _book(db, MONDAY - timedelta(minutes=MAX_INTERVIEW_MINUTES - 1), MAX_INTERVIEW_MINUTES, candidate_id=2)
+        assert [conflict["candidate_id"] for conflict in find_conflicts(db, MONDAY, 30, interviewer_user_id=2)] == [2]
+
+def test_interviews_stored_before_the_cap_are_found(engine):
+    with Session(engine) as db:
+        _book(db, MONDAY - timedelta(minutes=MAX_INTERVIEW_MINUTES + 60), MAX_INTERVIEW_MINUTES + 120)
+        assert len(find_conflicts(db, MONDAY, 30, interviewer_user_id=2)) == 1
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setattr(database, "_async_engine", create_async_engine(database.to_async_url(engine.url.render_as_string())))
+    etags._versions.clear()
+    main.app.dependency_overrides[get_current_user] = lambda: schemas.User(
+        id=1, username="recruiter", email="r@example.com", role="recruiter", is_active=True, is_approved=True,
+        created_at=datetime(2026, 1, 1),
+    )
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+    etags._versions.clear()
+
+def _interview(candidate_id, start, **fields):
+    return {"candidate_id": candidate_id, "job_id": 1, "interviewer": "i", "scheduled_date": start.isoformat(), **fields}
+
+def test_recruiter_can_book_parallel_interviews_for_others(client):
+    # Without an interviewer only the candidates' calendars are checked
+    assert client.post("/api/v1/interviews/", json=_interview(1, MONDAY)).status_code == 200
+    booked = client.post("/api/v1/interviews/", json=_interview(2, MONDAY))
+    assert booked.status_code == 200
+    assert booked.json()["interviewer_user_id"] == 1
+
+    clash = client.post("/api/v1/interviews/", json=_interview(1, MONDAY + timedelta(minutes=30)))
+    assert clash.status_code == 409
+    assert [conflict["party"] for conflict in clash.json()["detail"]["conflicts"]] == ["candidate"]
+
+def test_interviewer_conflicts_and_override(client):
+    assert client.post("/api/v1/interviews/", json=_interview(1, MONDAY, interviewer_user_id=2)).status_code == 200
+    clash = client.post("/api/v1/interviews/", json=_interview(2, MONDAY + timedelta(minutes=30), interviewer_user_id=2))
+    assert clash.status_code == 409
+    assert [conflict["party"] for conflict in clash.json()["detail"]["conflicts"]] == ["interviewer"]
+
+    forced = client.post(
+        "/api/v1/interviews/", params={"allow_conflicts": True},
+        json=_interview(2, MONDAY + timedelta(minutes=30), interviewer_user_id=2),
+    )
+    assert forced.status_code == 200
+    assert client.post("/api/v1/interviews/", json=_interview(3, MONDAY, interviewer_user_id=99)).status_code == 404
+
+def test_availability_for_hundreds_of_interviewers_over_a_month(engine):
+    interviewers, start = range(100, 400), datetime(2026, 3, 2)
+    rng = np.random.default_rng(0)
+    rows = [
+        {
+            "candidate_id": 1, "interviewer_name": "i", "interviewer_user_id": user_id, "duration_minutes": int(minutes),
+            "scheduled_date": start + timedelta(days=day, hours=int(hour), minutes=int(quarter) * 15),
+        }
+        for user_id in interviewers
+        for day in range(30)
+        for hour, quarter, minutes in zip(rng.integers(9, 17, 3), rng.integers(0, 4, 3), rng.choice([30, 45, 60, 90], 3))
+    ]
+    with Session(engine) as db:
+        db.execute(models.Interview.__table__.insert(), rows)
+        db.commit()
+
+        def availability(ids):
+            busy = merge_intervals(*busy_intervals(db, start, start + timedelta(days=30), ids))
+            windows = working_windows(start, start + timedelta(days=30), time(9), time(17))
+            return busy, free_slots(busy, windows, timedelta(minutes=60))
+
+        timings = []
+        for _ in range(3):
+            began = clock.perf_counter()
+            busy, _ = availability(list(interviewers))
+            timings.append(clock.perf_counter() - began)
+        # 27,000 interviews read, merged and swept, database read included
+        assert busy and min(timings) < 0.1
+        assert availability([100, 101])[1]
@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import migrations
+from app.core.search import like_search_query
+
+def test_like_fallback_matches_every_term_and_ranks_by_column_weight(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    migrations.upgrade(engine, log=lambda message: None)
+    with Session(engine) as db:
+        db.add_all([
+            models.JobPosting(id=1, title="Backend", description="python and SQL", required_skills="django",
+                              department="x", employment_type="ft"),
+            models.JobPosting(id=2, title="Python developer", description="SQL", required_skills="python",
+                              department="x", employment_type="ft"),
+            models.JobPosting(id=3, title="Python_dev", description="no database", required_skills="",
+                              department="x", employment_type="ft"),
+        ])
+        db.commit()
+
+        def ids(query):
+            statement = like_search_query("jobs", query, 10, 0, {})
+            return [row[0] for row in db.execute(statement)] if statement is not None else []
+
+        assert ids("PYTHON sql") == [2, 1]
+        # Underscores are matched literally, not as LIKE wildcards
+        assert ids("python_dev") == [3]
+        assert ids("!!") == []
@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+import io
+
+from fastapi import UploadFile
+from starlette.middleware import Middleware
+
+from app.core import storage
+from app.core.storage import BlobStore
+
+def _save(store, data: bytes):
+    return asyncio.run(store.save_upload(UploadFile(io.BytesIO(data), filename="cv.txt")))
+
+def test_text_upload_keeps_only_a_capped_copy_of_its_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_CV_TEXT_CHARS", 1000)
+    data = ("é" * 100_000).encode()  # spans many chunks, two bytes per character
+    blob = _save(BlobStore(str(tmp_path)), data)
+    assert blob.text == "é" * 1000
+    assert blob.sha256 == hashlib.sha256(data).hexdigest()
+    with open(blob.path, "rb") as f:
+        assert f.read() == data
+
+def test_invalid_utf8_after_the_cap_is_binary(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_CV_TEXT_CHARS", 10)
+    blob = _save(BlobStore(str(tmp_path)), b"a" * 200_000 + b"\xff")
+    assert blob.text is None
+
+def _upload_client(monkeypatch, max_bytes):
+    import main
+    from fastapi.testclient import TestClient
+    from app.core.storage import UploadLimitMiddleware
+
+    # The middleware stack is built on first use; rebuild it with a small limit
+    monkeypatch.setattr(main.app, "user_middleware", [
+        Middleware(UploadLimitMiddleware, paths=["/api/v1/candidates/upload/"], max_bytes=max_bytes)
+        if middleware.cls is UploadLimitMiddleware else middleware
+        for middleware in main.app.user_middleware
+    ])
+    monkeypatch.setattr(main.app, "middleware_stack", None)
+    return TestClient(main.app)
+
+def test_oversized_content_length_is_refused_unread(monkeypatch):
+    client = _upload_client(monkeypatch, 1000)
+    response = client.post("/api/v1/candidates/upload/", data={"name": "a", "email": "a@example.com", "job_id": "1"},
+                           files={"file": ("cv.txt", b"x" * 5000)})
+    assert response.status_code == 413
+
+def test_chunked_upload_is_cut_off_while_streaming(monkeypatch):
+    client = _upload_client(monkeypatch, 1000)
+    body = b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"cv.txt\"\r\n\r\n" + b"x" * 5000 + b"\r\n--b--\r\n"
+
+    def chunks():
+        for start in range(0, len(body), 500):
+            yield body[start:start + 500]
+
+    response = client.post("/api/v1/candidates/upload/", content=chunks(),
+                           headers={"content-type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413